@@ -0,0 +1,808 @@
+import gc
+import sys
+import time
+import asyncio
+import micropython
+from micropython import const
+
+print("app.py: starting application")
+
+_boot_ticks = time.ticks_ms()
+
+_MB = const(1 << 20)
+
+# Set to 1 to print full tracebacks for init failures
+_DEBUG = const(0)
+
+# Free heap for Device Info: set by _gc_tune() after init, refreshed
+# (without collecting) each time the Device Info menu is opened
+_last_free_ram = 0
+
+# Pin assignments (Waveshare ESP32-S3-LCD-1.47)
+_LED_PIN = const(38)
+_BTN_PIN = const(0)
+_SD_SCK = const(14)
+_SD_MOSI = const(15)
+_SD_MISO = const(16)
+_SD_CS = const(21)
+_SD_SPI_ID = const(1)
+
+# Settings-menu LED brightness steps
+_LED_LEVELS = {"Off": 0.0, "Low": 0.1, "Med": 0.3, "High": 1.0}
+
+# Peripheral references (set by _init_peripherals(), used by callbacks)
+display = None
+led = None
+sd = None
+key_store = None
+menu = None
+button = None
+
+# menu_ui.make_menu, bound once by _init_menu() for the menu builders
+_make_menu = None
+
+# ugit module, imported on first OTA attempt (see _get_ugit)
+_ugit = None
+
+# Running OTA task, if any (see _start_ota)
+_ota_task = None
+
+# BLE server and bridge references (set in main(), used by callbacks)
+server = None
+bridge = None
+
+# BLE link state, tracked by on_status()
+_ble_connected = False
+
+
+# ---------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------
+
+def _log(msg):
+    """Log to display if available."""
+    if display:
+        display.log(msg)
+
+
+def _err_text(e, n):
+    """Short description of an exception for the display log.
+
+    Uses the first arg (message or errno) instead of str(e), and falls
+    back to a constant if even that fails -- error paths often run when
+    the heap is already tight.
+    """
+    try:
+        a = e.args
+        if not a:
+            return type(e).__name__[:n]
+        a = a[0]
+        if isinstance(a, str):
+            return a[:n]
+        return ("%r" % (a,))[:n]
+    except Exception:
+        return "err"
+
+
+def _get_ugit():
+    """Import ugit once and cache it. Raises ImportError if not installed."""
+    global _ugit
+    if _ugit is None:
+        import ugit
+        _ugit = ugit
+    return _ugit
+
+
+# ---------------------------------------------------------------
+# Menu structure builders (lazy -- called on demand). Static menus
+# are built once and cached; key list/detail menus are rebuilt.
+# ---------------------------------------------------------------
+
+_menu_cache = {}
+
+def _build_main_menu():
+    m = _menu_cache.get("main")
+    if m is None:
+        m = _make_menu(
+            ("Device Info", "Keys", "Settings", "OTA Update", "About"),
+            b"ssssc",
+            (_build_device_info, _build_keys_menu, _build_settings_menu,
+             _build_ota_menu, _show_about))
+        _menu_cache["main"] = m
+    return m
+
+
+def _build_device_info():
+    global _last_free_ram
+    # Cheap read, no collection; the figure includes uncollected garbage
+    _last_free_ram = gc.mem_free()
+    m = _menu_cache.get("device_info")
+    if m is None:
+        m = ("Device Info", _make_menu(
+            ("BLE", "Bridge", "SD Card", "Uptime", "Free RAM", "< Back"),
+            b"iiiiic",
+            (_get_ble_info, _get_bridge_info, _get_sd_info, _get_uptime,
+             _get_free_ram, None)))
+        _menu_cache["device_info"] = m
+    return m
+
+
+def _get_ble_info():
+    if _ble_connected:
+        return "Connected"
+    return "Advertising"
+
+
+def _get_bridge_info():
+    if bridge and server and server.connected:
+        return "Active"
+    elif bridge:
+        return "Idle"
+    return "Off"
+
+
+def _get_sd_info():
+    if sd and sd.is_mounted:
+        info = sd.free_space()
+        if info:
+            return "%dMB free" % (info[0] >> 20)
+        return "Mounted"
+    return "No card"
+
+
+def _get_uptime():
+    secs = time.ticks_diff(time.ticks_ms(), _boot_ticks) // 1000
+    if secs >= 3600:
+        return "%dh%dm" % (secs // 3600, (secs // 60) % 60)
+    return "%dm%ds" % (secs // 60, secs % 60)
+
+
+def _get_free_ram():
+    # Read when Device Info was opened -- no collection on the menu path
+    free = _last_free_ram
+    if free > _MB:
+        return "%.1fMB" % (free / _MB)
+    return "%dKB" % (free >> 10)
+
+
+# --- Constant info values ---
+
+def _info_via_ble():
+    return "via BLE"
+
+
+def _info_ble_name():
+    return "KeyMaster"
+
+
+def _info_na():
+    return "N/A"
+
+
+# --- Keys menu ---
+
+class _KeyAction:
+    """Callable binding a key name to an operation: op(name).
+
+    Used as menu item data in place of per-build lambdas/closures.
+    """
+    __slots__ = ('name', 'op')
+
+    def __init__(self, name, op):
+        self.name = name
+        self.op = op
+
+    def __call__(self):
+        return self.op(self.name)
+
+
+# name -> _KeyAction(name, _build_key_detail), reused across list opens
+_key_actions = {}
+
+
+def _build_keys_menu():
+    m = _menu_cache.get("keys")
+    if m is None:
+        m = ("Keys", _make_menu(
+            ("List Keys", "Add Key", "< Back"),
+            b"sic",
+            (_build_key_list, _info_via_ble, None)))
+        _menu_cache["keys"] = m
+    return m
+
+
+def _build_key_list():
+    global _key_actions
+    names = key_store.list_keys() if key_store else []
+    n = len(names)
+    if not n:
+        return ("Keys", _make_menu(
+            ("(no keys)", "< Back"), b"ic", (None, None)))
+    # A slot per key plus "< Back"; the key names themselves are the labels
+    labels = names + ["< Back"]
+    datas = [None] * (n + 1)
+    actions = {}
+    for i in range(n):
+        name = names[i]
+        act = _key_actions.get(name)
+        if act is None:
+            act = _KeyAction(name, _build_key_detail)
+        actions[name] = act
+        datas[i] = act
+    # Drop actions for keys that no longer exist
+    _key_actions = actions
+    return ("Keys", _make_menu(labels, b"s" * n + b"c", datas))
+
+
+def _build_key_detail(name):
+    return (name[:18], _make_menu(
+        ("View", "Send BLE", "Delete", "< Back"),
+        b"cccc",
+        (_KeyAction(name, _view_key), _KeyAction(name, _send_key_ble),
+         _KeyAction(name, _delete_key), None)))
+
+
+def _view_key(name):
+    """Show first/last chars of key value on display (masked)."""
+    if key_store:
+        k = key_store.get_key(name)
+        if k and k.get("value"):
+            v = k["value"]
+            if len(v) > 8:
+                _log("Key: %s...%s" % (v[:4], v[-4:]))
+            else:
+                _log("Key: %s" % v)
+
+
+def _send_key_ble(name):
+    """Send key value over BLE to connected device."""
+    if key_store and server:
+        k = key_store.get_key(name)
+        if k and k.get("value"):
+            try:
+                server.send(k["value"])
+                _log("Sent: %s" % name)
+            except Exception as e:
+                _log("Send fail: %s" % _err_text(e, 10))
+        else:
+            _log("Key not found")
+    else:
+        _log("No BLE/keys")
+
+
+def _delete_key(name):
+    """Delete key from SD card."""
+    if key_store:
+        if key_store.delete_key(name):
+            _log("Deleted: %s" % name)
+        else:
+            _log("Not found: %s" % name)
+    # Pop back to key list
+    if menu and menu.is_active:
+        menu._pop()
+
+
+# --- Settings menu ---
+
+def _build_settings_menu():
+    # Cached with the rest; the cycle item's "idx" therefore persists and
+    # keeps showing the brightness that was last selected.
+    m = _menu_cache.get("settings")
+    if m is None:
+        m = ("Settings", _make_menu(
+            ("LED Bright", "BLE Name", "WiFi", "< Back"),
+            b"yiic",
+            ({
+                "values": ["Off", "Low", "Med", "High"],
+                "idx": 1,  # Default: Low (matches 0.3 init)
+                "cb": _set_led_brightness,
+            }, _info_ble_name, _info_na, None)))
+        _menu_cache["settings"] = m
+    return m
+
+
+def _set_led_brightness(value):
+    if led:
+        led.brightness = _LED_LEVELS.get(value, 0.3)
+        # Show current color at new brightness
+        if _ble_connected:
+            led.status_connected()
+        else:
+            led.status_advertising()
+
+
+# --- OTA menu ---
+
+def _build_ota_menu():
+    m = _menu_cache.get("ota")
+    if m is None:
+        m = ("OTA Update?", _make_menu(
+            ("Pull Update", "Cancel"),
+            b"cc",
+            (_do_ota_update, None)))
+        _menu_cache["ota"] = m
+    return m
+
+
+def _do_ota_update():
+    """Menu action: close the menu and start the OTA task. The status
+    screen is restored by _exit_menu() once this callback returns."""
+    if menu:
+        menu.close()
+    _start_ota(("OTA: connecting...",))
+
+
+def _start_ota(messages):
+    """Log messages and schedule _ota_update() unless already running."""
+    global _ota_task
+    if _ota_task is not None:
+        _log("OTA: in progress")
+        return
+    if display:
+        display.log_many(messages)
+    _ota_task = asyncio.create_task(_ota_update())
+
+
+async def _ota_update():
+    """Run ugit wificonnect + pull. Restarts the device on success.
+
+    ugit is blocking, so each stage still holds the loop while it runs;
+    yielding between stages lets BLE, the button and the display catch
+    up instead of freezing for the whole update.
+    """
+    global _ota_task
+    try:
+        if display:
+            display.flush()
+        await asyncio.sleep_ms(0)
+        ugit = _get_ugit()
+        ugit.wificonnect()
+        _log("OTA: pulling...")
+        if display:
+            display.flush()
+        await asyncio.sleep_ms(0)
+        ugit.pull_all()
+        _log("OTA: done! Reset...")
+        if display:
+            display.flush()
+        await asyncio.sleep_ms(0)
+        import machine
+        machine.reset()
+    except ImportError:
+        _log("OTA: ugit not found")
+    except Exception as e:
+        _log("OTA fail: %s" % _err_text(e, 12))
+    _ota_task = None
+
+
+# --- About ---
+
+def _show_about():
+    """Show version info, then close menu."""
+    if menu:
+        menu.close()
+    _restore_button_callbacks()
+    if display:
+        display.restore_status_screen(
+            "connected" if _is_ble_connected() else "advertising"
+        )
+        display.log_many((
+            "Cortex-Link v0.3.0",
+            "ESP32-S3-LCD-1.47",
+            "github.com/",
+            "  turfptax/",
+            "  cortex-link",
+        ))
+
+
+def _is_ble_connected():
+    return _ble_connected
+
+
+# ---------------------------------------------------------------
+# Button handlers + menu state switching. The per-press handlers are
+# compiled with the native emitter; keep them short, native code is
+# several times larger than bytecode.
+# ---------------------------------------------------------------
+
+# (on_press, on_long_press) saved while the menu owns the button
+_saved_btn_cbs = None
+
+
+@micropython.native
+def _on_button_press(duration_ms):
+    """Short press -- STATUS mode: show device info in log."""
+    print("Button short press: %dms" % duration_ms)
+    if display:
+        display.log_many((
+            "BTN: short %dms" % duration_ms,
+            "SD: mounted" if sd and sd.is_mounted else "SD: not available",
+        ))
+
+
+@micropython.native
+def _on_button_long_press(duration_ms):
+    """Long press -- STATUS mode: open menu."""
+    print("Button long press: %dms" % duration_ms)
+    if menu and display:
+        _enter_menu()
+    else:
+        _log("Menu not available")
+
+
+def _on_button_very_long_press(duration_ms):
+    """Very long press (3s+) -- trigger OTA update via ugit."""
+    print("Button very long press: %dms -- OTA update" % duration_ms)
+    # Close menu if active
+    if menu and menu.is_active:
+        menu.close()
+        _restore_button_callbacks()
+    if display:
+        display.restore_status_screen(
+            "connected" if _is_ble_connected() else "advertising"
+        )
+    _start_ota(("OTA: hold detected", "OTA: connecting WiFi..."))
+
+
+def _enter_menu():
+    """Switch from STATUS mode to MENU mode."""
+    global _saved_btn_cbs
+    if not menu or not button:
+        return
+    # Save original callbacks
+    _saved_btn_cbs = (button.on_press, button.on_long_press)
+    # Swap to menu navigation callbacks
+    button.on_press = _menu_short_press
+    button.on_long_press = _menu_long_press
+    # Build and open the root menu
+    menu.open("Cortex-Link", _build_main_menu())
+
+
+@micropython.native
+def _menu_short_press(duration_ms):
+    """MENU mode: advance cursor."""
+    if menu and menu.is_active:
+        menu.on_short_press()
+
+
+@micropython.native
+def _menu_long_press(duration_ms):
+    """MENU mode: select item."""
+    if menu and menu.is_active:
+        menu.on_long_press()
+        # Check if menu was closed by the action (< Back from root, About, OTA)
+        if not menu.is_active:
+            _exit_menu()
+
+
+def _exit_menu():
+    """Return from MENU mode to STATUS mode."""
+    _restore_button_callbacks()
+    if display:
+        state = "connected" if _is_ble_connected() else "advertising"
+        display.restore_status_screen(state)
+
+
+def _restore_button_callbacks():
+    """Restore original button callbacks."""
+    global _saved_btn_cbs
+    if button and _saved_btn_cbs:
+        button.on_press, button.on_long_press = _saved_btn_cbs
+        _saved_btn_cbs = None
+
+
+# ---------------------------------------------------------------
+# BLE / Bridge callbacks
+# ---------------------------------------------------------------
+
+def _parse_cmd_name(message):
+    """Extract command name from a CMD:<command>:... message."""
+    if message.startswith("CMD:"):
+        rest = message[4:]
+        # CMD:ping or CMD:note:{...}
+        colon = rest.find(":")
+        if colon == -1:
+            return rest.strip()
+        return rest[:colon]
+    # Handle chunked messages: "CHUNK 1/N CMD:command:..."
+    idx = message.find("CMD:")
+    if idx >= 0:
+        rest = message[idx + 4:]
+        colon = rest.find(":")
+        if colon == -1:
+            return rest.strip()
+        return rest[:colon]
+    return None
+
+
+def on_bridge_activity(direction, message):
+    """Called by SerialBridge on data flow. Updates display and LED."""
+    if direction == "serial_in":
+        _log("S>B: %.16s" % message)
+        if led:
+            led.set_color(0, 200, 200)  # Teal for serial->BLE
+        # Detect Cortex tool commands and flash icon
+        if display:
+            cmd = _parse_cmd_name(message)
+            if cmd:
+                display.tool_triggered(cmd)
+    elif direction == "tool_notify":
+        # Icon notification from MCP server (WiFi transport mode).
+        # message is the raw command name (e.g. "note", "ping").
+        if display:
+            display.tool_triggered(message)
+        if led:
+            led.set_color(0, 200, 200)
+    elif direction == "ble_in":
+        _log("B>S: %.16s" % message)
+        if led:
+            led.status_rx()
+
+
+# event -> no-arg handler, filled by _build_status_dispatch() after init.
+# "connected" (display needs detail) and "error" are handled explicitly.
+_disp_dispatch = {}
+_led_dispatch = {}
+
+
+def _build_status_dispatch():
+    """(Re)build the on_status lookup tables from the current display/led."""
+    global _disp_dispatch, _led_dispatch
+    _disp_dispatch = {
+        "advertising": display.show_advertising,
+        "disconnected": display.show_disconnected,
+    } if display else {}
+    _led_dispatch = {
+        "advertising": led.status_advertising,
+        "connected": led.status_connected,
+        "disconnected": led.status_disconnected,
+    } if led else {}
+
+
+def on_status(event, detail=""):
+    """Called on BLE state transitions. Updates display and LED."""
+    global _ble_connected
+    if event == "connected":
+        _ble_connected = True
+    elif event == "disconnected" or event == "error":
+        _ble_connected = False
+
+    if event == "error":
+        if display:
+            display.log("ERR: %s" % detail)
+        if led:
+            led.status_error()
+        return
+
+    if display:
+        if event == "connected":
+            display.show_connected(detail)
+        else:
+            fn = _disp_dispatch.get(event)
+            if fn:
+                fn()
+
+    if led:
+        fn = _led_dispatch.get(event)
+        if fn:
+            fn()
+
+
+# ---------------------------------------------------------------
+# Hardware init -- each peripheral is optional; failures are caught
+# so the BLE server always starts. Called from main() once the BLE
+# server exists, so driver imports and their buffers don't claim heap
+# ahead of the BLE stack. Each _init_*() returns the object or None
+# and _init_peripherals() stores it in the matching global.
+# ---------------------------------------------------------------
+
+def _init_display():
+    from display_manager import DisplayManager
+    d = DisplayManager()
+    d.show_startup()
+    d.log("Display initialized")
+    return d
+
+
+def _init_led():
+    from led_manager import LEDManager
+    lm = LEDManager(pin=_LED_PIN, brightness=0.3)
+    lm.status_startup()
+    return lm
+
+
+def _init_sd():
+    from sd_manager import SDManager
+    s = SDManager(sck=_SD_SCK, mosi=_SD_MOSI, miso=_SD_MISO,
+                  cs=_SD_CS, spi_id=_SD_SPI_ID)
+    if not s.mount():
+        return None  # mount failed, treat as unavailable
+    info = s.free_space()
+    if info:
+        print("app.py: SD card %.1f/%.1f MB free"
+              % (info[0] / _MB, info[1] / _MB))
+        if display:
+            display.log("SD: %d/%dMB" % (info[0] >> 20, info[1] >> 20))
+    print("app.py: SD files:", s.list_files())
+    return s
+
+
+def _init_key_store():
+    """Key store (requires SD)."""
+    if sd and sd.is_mounted:
+        from key_store import KeyStore
+        return KeyStore(sd)
+    return None
+
+
+def _init_menu():
+    """Menu system (requires display)."""
+    global _make_menu
+    if display:
+        from menu_ui import MenuManager, make_menu
+        _make_menu = make_menu
+        return MenuManager(display)
+    return None
+
+
+def _init_button():
+    from button import ButtonManager
+    return ButtonManager(
+        pin=_BTN_PIN,
+        on_press=_on_button_press,
+        on_long_press=_on_button_long_press,
+        on_very_long_press=_on_button_very_long_press,
+    )
+
+
+# (global name, log label, init function), in dependency order
+_INIT_TABLE = (
+    ("display", "display", _init_display),
+    ("led", "LED", _init_led),
+    ("sd", "SD", _init_sd),
+    ("key_store", "key store", _init_key_store),
+    ("menu", "menu system", _init_menu),
+    ("button", "button", _init_button),
+)
+
+
+def _init_peripherals():
+    g = globals()
+    for name, label, fn in _INIT_TABLE:
+        try:
+            obj = fn()
+            if obj is not None:
+                print("app.py: %s initialized OK" % label)
+        except Exception as e:
+            print("app.py: %s init FAILED:" % label, e)
+            if _DEBUG:
+                sys.print_exception(e)
+            obj = None
+        g[name] = obj
+
+
+# ---------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------
+
+def _gc_tune():
+    """One full collection after init, then re-tune the threshold from
+    boot.py to the heap that's actually left. Not called from a loop."""
+    global _last_free_ram
+    gc.collect()
+    _last_free_ram = gc.mem_free()
+    if hasattr(gc, 'threshold'):
+        gc.threshold(_last_free_ram // 4 + gc.mem_alloc())
+
+
+async def _icon_fade_task():
+    """Periodically update icon states (active -> recent -> dim)."""
+    while True:
+        if display and not display.menu_active:
+            try:
+                display.update_icons()
+            except Exception:
+                pass
+        await asyncio.sleep_ms(500)
+
+
+# Static part of the USB serial banner (no peripheral state). Kept as
+# one string so boot costs a single UART write instead of ~25.
+_BANNER = """\
+============================================
+  Cortex-Link  |  BLE Bridge  |  v0.3.0
+============================================
+
+This is a Cortex wearable AI memory dongle.
+It bridges USB serial to a Pi Zero 2 W over
+Bluetooth Low Energy (BLE).
+
+-- Quick Setup (any computer) --
+
+  pip install git+https://github.com/
+    turfptax/cortex.git
+
+  python -m cortex_mcp setup
+  python -m cortex_mcp setup --target claude-desktop
+  python -m cortex_mcp ping
+
+Docs: https://github.com/turfptax/cortex
+
+-- Hardware Controls --
+
+  Short press BOOT  = device info
+  Long press BOOT   = open menu
+  Hold BOOT 3s+     = OTA update
+"""
+
+
+def _print_status():
+    """Peripheral part of the banner, printed once init has run."""
+    lines = ["-- Status --", ""]
+    if sd and sd.is_mounted:
+        lines.append("  SD card: mounted at %s" % sd.mount_point)
+    else:
+        lines.append("  SD card: not available")
+    if key_store:
+        lines.append("  Keys stored: %d" % len(key_store.list_keys()))
+    if led:
+        lines.append("  NeoPixel LED: active")
+    if menu:
+        lines.append("  Menu system: ready")
+    if button:
+        lines.append("  BOOT button: monitored")
+    lines.append("""
+Bridge: USB Serial <-> BLE transparent pipe
+  Newline-delimited, max 512 bytes/msg
+  Send CMD:ping to test round trip
+""")
+    print("\n".join(lines))
+
+
+async def main():
+    global server, bridge
+
+    # Banner first so the serial console shows life immediately
+    print(_BANNER)
+
+    # Create BLE server before any peripheral driver is imported
+    # (on_receive wired to bridge below)
+    from ble_server import BLEServer
+    server = BLEServer(
+        device_name="KeyMaster",
+        on_receive=None,
+        on_status=on_status,
+    )
+
+    _init_peripherals()
+    _build_status_dispatch()
+
+    # One collection once everything is up, then re-tune the threshold
+    # from boot.py to the heap that's actually left for runtime use
+    _gc_tune()
+
+    _print_status()
+
+    _log("Starting BLE...")
+
+    # Create serial bridge and wire as BLE receive handler
+    from serial_bridge import SerialBridge
+    bridge = SerialBridge(
+        ble_server=server,
+        on_activity=on_bridge_activity,
+    )
+    server._on_receive = bridge.on_ble_receive
+
+    _log("BLE + Bridge ready")
+
+    # Schedule the background tasks; server.run() never returns and
+    # keeps the event loop alive
+    asyncio.create_task(bridge.run())
+    if button:
+        asyncio.create_task(button.monitor())
+    if display:
+        asyncio.create_task(display.flusher())
+        asyncio.create_task(_icon_fade_task())
+
+    await server.run()
+
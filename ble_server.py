@@ -1,4 +1,3 @@
-import gc
 import asyncio
 import bluetooth
 import aioble
@@ -10,11 +9,22 @@ _SERVICE_UUID = UUID("a0e1b2c3-d4e5-f6a7-b8c9-0a1b2c3d4e50")
 _TX_UUID = UUID("a0e1b2c3-d4e5-f6a7-b8c9-0a1b2c3d4e51")  # ESP32 -> Phone
 _RX_UUID = UUID("a0e1b2c3-d4e5-f6a7-b8c9-0a1b2c3d4e52")  # Phone -> ESP32
 
-_ADV_INTERVAL_US = 250_000  # 250ms
+_ADV_FAST_US = 100_000  # 100ms -- right after boot/disconnect, for quick reconnect
+_ADV_SLOW_US = 1_000_000  # 1s -- once nobody has reconnected, to save radio power
+_ADV_FAST_MS = 30_000  # How long to stay on the fast interval
+_DISCONNECT_CHECK_MS = 30_000  # Re-check link state if a disconnect event is missed
+_RX_WAIT_MS = 30_000  # Idle timeout for RX writes (the await itself yields)
 
 
 class BLEServer:
     def __init__(self, device_name="KeyMaster", on_receive=None, on_status=None):
+        """
+        Args:
+            device_name: Advertised BLE name.
+            on_receive: Optional callback(server, message, connection) per
+                        newline-delimited RX message (bytes, no newline).
+            on_status: Optional callback(event, detail) on state changes.
+        """
         self._name = device_name
         self._on_receive = on_receive
         self._on_status = on_status
@@ -58,11 +68,14 @@ class BLEServer:
                 print("BLE: status callback error:", e)
 
     def send(self, data):
-        """Send a string to the connected device via TX notification."""
+        """Send data to the connected device via TX notification.
+        Strings are UTF-8 encoded; bytes/bytearray/memoryview go as-is."""
         if not self.connected:
             print("BLE: not connected, cannot send")
             return
-        self._tx_char.write(data.encode("utf-8"), send_update=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._tx_char.write(data, send_update=True)
 
     def send_raw(self, data_bytes):
         """Send raw bytes via TX notification (no encoding).
@@ -73,6 +86,8 @@ class BLEServer:
 
     async def run(self):
         """Start the BLE server. Runs forever (advertise + receive loop)."""
+        # gather (not a detached create_task) so an exception in the RX
+        # task reaches the caller instead of silently stopping receive
         await asyncio.gather(
             self._advertise_task(),
             self._rx_task(),
@@ -83,12 +98,7 @@ class BLEServer:
             print("BLE: advertising as '{}'...".format(self._name))
             self._notify_status("advertising")
             try:
-                connection = await aioble.advertise(
-                    _ADV_INTERVAL_US,
-                    name=self._name,
-                    services=[_SERVICE_UUID],
-                    connectable=True,
-                )
+                connection = await self._advertise()
                 self._connection = connection
                 print("BLE: connected to", connection.device)
 
@@ -101,10 +111,15 @@ class BLEServer:
 
                 self._notify_status("connected", str(connection.device))
 
-                # Poll for disconnection -- more reliable than
-                # await connection.disconnected() which can miss events
+                # Wait for the disconnect event. disconnected() has been seen
+                # to miss events, so time out periodically and re-check the
+                # link instead of trusting it alone.
                 while connection.is_connected():
-                    await asyncio.sleep_ms(500)
+                    try:
+                        await connection.disconnected(
+                            timeout_ms=_DISCONNECT_CHECK_MS)
+                    except asyncio.TimeoutError:
+                        pass
 
             except aioble.DeviceDisconnectedError:
                 pass
@@ -122,15 +137,34 @@ class BLEServer:
             self._connection = None
             print("BLE: disconnected")
             self._notify_status("disconnected")
-            gc.collect()
+
+    async def _advertise(self):
+        """Advertise until a central connects. Uses the fast interval for
+        _ADV_FAST_MS, then drops to the slow interval indefinitely."""
+        try:
+            return await aioble.advertise(
+                _ADV_FAST_US,
+                name=self._name,
+                services=[_SERVICE_UUID],
+                connectable=True,
+                timeout_ms=_ADV_FAST_MS,
+            )
+        except asyncio.TimeoutError:
+            print("BLE: no connection, slowing advertising")
+        return await aioble.advertise(
+            _ADV_SLOW_US,
+            name=self._name,
+            services=[_SERVICE_UUID],
+            connectable=True,
+        )
 
     async def _rx_task(self):
         rx_buf = bytearray()
         while True:
             try:
-                connection, data = await self._rx_char.written(timeout_ms=1000)
+                connection, data = await self._rx_char.written(
+                    timeout_ms=_RX_WAIT_MS)
             except asyncio.TimeoutError:
-                await asyncio.sleep_ms(50)
                 continue
             except aioble.DeviceDisconnectedError:
                 rx_buf = bytearray()
@@ -139,13 +173,11 @@ class BLEServer:
 
             rx_buf.extend(data)
 
-            # Process complete newline-delimited messages
+            # Process complete newline-delimited messages. Messages are
+            # passed on as bytes; consumers decode only what they display.
             while b"\n" in rx_buf:
                 idx = rx_buf.index(b"\n")
-                try:
-                    message = bytes(rx_buf[:idx]).decode("utf-8")
-                except UnicodeError:
-                    message = str(bytes(rx_buf[:idx]))
+                message = bytes(rx_buf[:idx])
                 rx_buf = rx_buf[idx + 1:]
 
                 self._notify_status("rx", message)
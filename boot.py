@@ -14,5 +14,21 @@ import gc
 import esp
 esp.osdebug(None)
 gc.collect()
+# Collect proactively once another quarter of the free heap has been
+# allocated, rather than only when an allocation fails on a fragmented heap
+# (gc.threshold is optional in MicroPython builds)
+if hasattr(gc, 'threshold'):
+    gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+
+# Report IDF heap state so fragmentation (BLE + WiFi/TLS during ugit) can
+# be tuned from the serial log. Each region: (total, free, largest, min_free)
+try:
+    import esp32
+    regions = esp32.idf_heap_info(esp32.HEAP_DATA)
+    print("boot.py: IDF heap free={} largest={}".format(
+        sum(r[1] for r in regions), max(r[2] for r in regions)))
+    del regions
+except Exception:
+    pass
 
 print("boot.py: system ready")
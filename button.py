@@ -3,6 +3,7 @@ BOOT button handler for Waveshare ESP32-S3-LCD-1.47.
 
 GPIO 0 -- active LOW with internal pull-up.
 Provides async monitoring with debounce and short/long press detection.
+A falling-edge IRQ wakes the monitor, so nothing polls while idle.
 """
 
 import asyncio
@@ -27,8 +28,14 @@ class ButtonManager:
         self._debounce_ms = 50
         self._long_press_ms = 1000
         self._very_long_press_ms = 3000
+        self._flag = asyncio.ThreadSafeFlag()
+        self._pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_irq)
         print("Button: initialized on GPIO", pin)
 
+    def _on_irq(self, pin):
+        """Falling edge (press) -- wake the monitor task."""
+        self._flag.set()
+
     @property
     def is_pressed(self):
         """True when the button is currently held down (active LOW)."""
@@ -61,40 +68,43 @@ class ButtonManager:
     async def monitor(self):
         """Run forever, detecting button presses.
 
-        Designed to be added to asyncio.gather() alongside other tasks.
+        Designed to be scheduled with asyncio.create_task() alongside other tasks.
         """
         print("Button: monitor started")
+        ticks_ms = time.ticks_ms
+        ticks_diff = time.ticks_diff
+        value = self._pin.value
         while True:
             try:
-                # Wait for button press (active LOW)
-                if self._pin.value() == 0:
-                    # Debounce -- wait and re-check
-                    await asyncio.sleep_ms(self._debounce_ms)
-                    if self._pin.value() != 0:
-                        # False trigger
-                        continue
-
-                    # Button is genuinely pressed -- time the hold
-                    press_start = time.ticks_ms()
-
-                    # Wait for release
-                    while self._pin.value() == 0:
-                        await asyncio.sleep_ms(20)
-
-                    duration = time.ticks_diff(time.ticks_ms(), press_start)
-                    print("Button: press {}ms".format(duration))
-
-                    if duration >= self._very_long_press_ms:
-                        if self._on_very_long_press:
-                            self._on_very_long_press(duration)
-                    elif duration >= self._long_press_ms:
-                        if self._on_long_press:
-                            self._on_long_press(duration)
-                    else:
-                        if self._on_press:
-                            self._on_press(duration)
+                # Sleep until the IRQ reports a press (active LOW)
+                await self._flag.wait()
+
+                # Debounce -- wait and re-check. Bounce edges left over
+                # from the previous press also land here and are dropped.
+                await asyncio.sleep_ms(self._debounce_ms)
+                if value() != 0:
+                    # False trigger
+                    continue
+
+                # Button is genuinely pressed -- time the hold
+                press_start = ticks_ms()
+
+                # Wait for release (polls only while held)
+                while value() == 0:
+                    await asyncio.sleep_ms(20)
+
+                duration = ticks_diff(ticks_ms(), press_start)
+                print("Button: press {}ms".format(duration))
+
+                if duration >= self._very_long_press_ms:
+                    if self._on_very_long_press:
+                        self._on_very_long_press(duration)
+                elif duration >= self._long_press_ms:
+                    if self._on_long_press:
+                        self._on_long_press(duration)
+                else:
+                    if self._on_press:
+                        self._on_press(duration)
 
             except Exception as e:
                 print("Button: monitor error:", e)
-
-            await asyncio.sleep_ms(50)
@@ -11,25 +11,27 @@ Layout (top to bottom):
   Icon panel   (224-319)  6 tool activity icons in 3x2 grid
 """
 
-import gc
+import asyncio
+import framebuf
+from micropython import const
 from machine import Pin, SPI
 import st7789py as st7789
 import vga1_8x16 as font
 
 
 # --- Pin Configuration (Waveshare ESP32-S3-LCD-1.47) ---
-_SPI_ID   = 2
-_BAUDRATE = 40_000_000
-_SCK      = 40
-_MOSI     = 45
-_CS       = 42
-_DC       = 41
-_RST      = 39
-_BL       = 48
+_SPI_ID   = const(2)
+_BAUDRATE = const(40_000_000)
+_SCK      = const(40)
+_MOSI     = const(45)
+_CS       = const(42)
+_DC       = const(41)
+_RST      = const(39)
+_BL       = const(48)
 
 # --- Display Geometry ---
-_WIDTH  = 172
-_HEIGHT = 320
+_WIDTH  = const(172)
+_HEIGHT = const(320)
 
 # Custom rotation table for 172x320
 # Format: (madctl, width, height, xstart, ystart, needs_swap)
@@ -42,27 +44,42 @@ _CUSTOM_ROTATIONS = (
 )
 
 # --- Layout Constants ---
-_CHAR_W         = font.WIDTH                          # 8
-_CHAR_H         = font.HEIGHT                         # 16
-_CHARS_PER_LINE = _WIDTH // _CHAR_W                   # 21
-_TITLE_H        = 2 * _CHAR_H                        # 32px (2 lines)
-_SEP1_Y         = _TITLE_H                            # 32
-_STATUS_Y       = _SEP1_Y + _CHAR_H                   # 48
-_SEP2_Y         = _STATUS_Y + 2 * _CHAR_H             # 80
-_LOG_Y          = _SEP2_Y + _CHAR_H                    # 96
-_ICON_PANEL_Y   = 224                                  # Icon panel starts here
-_MAX_LOG_LINES  = (_ICON_PANEL_Y - _LOG_Y) // _CHAR_H # 8
+# const() needs compile-time values, so the glyph size is spelled out --
+# keep in sync with vga1_8x16.WIDTH / HEIGHT.
+_CHAR_W         = const(8)                            # font.WIDTH
+_CHAR_H         = const(16)                           # font.HEIGHT
+_CHARS_PER_LINE = const(_WIDTH // _CHAR_W)            # 21
+_TITLE_H        = const(2 * _CHAR_H)                  # 32px (2 lines)
+_SEP1_Y         = const(_TITLE_H)                     # 32
+_STATUS_Y       = const(_SEP1_Y + _CHAR_H)            # 48
+_SEP2_Y         = const(_STATUS_Y + 2 * _CHAR_H)      # 80
+_LOG_Y          = const(_SEP2_Y + _CHAR_H)            # 96
+_ICON_PANEL_Y   = const(224)                          # Icon panel starts here
+_MAX_LOG_LINES  = const((_ICON_PANEL_Y - _LOG_Y) // _CHAR_H)  # 8
+_LOG_COLS       = const(_CHARS_PER_LINE - 2)          # 19 (room for "> " prefix)
+_LOG_H          = const(_MAX_LOG_LINES * _CHAR_H)     # 128px
+_STATUS_ZONE_Y  = const(_SEP1_Y + 1)                  # 33 (below sep1)
+_STATUS_ZONE_H  = const(_SEP2_Y - _SEP1_Y - 1)        # 47px (above sep2)
+_GLYPH_BYTES    = const(_CHAR_H * ((_CHAR_W + 7) // 8))  # 16 (1bpp glyph)
+_ASYNC_ROWS     = const(16)                           # Rows per SPI slice before yielding
+_FLUSH_MS       = const(30)                           # Log redraw coalescing window
 
 # --- Colors (RGB565) ---
-_TITLE_BG  = st7789.color565(0, 0, 80)                # Dark blue
-_TITLE_FG  = st7789.WHITE
-_SEP_COLOR = st7789.color565(60, 60, 60)               # Dark gray
-_ADV_COLOR = st7789.YELLOW
-_CONN_COLOR = st7789.GREEN
-_DISC_COLOR = st7789.RED
-_LOG_FG    = st7789.CYAN
-_BG        = st7789.BLACK
-_LABEL_FG  = st7789.WHITE
+_TITLE_BG   = const(0x000A)   # color565(0, 0, 80) -- dark blue
+_TITLE_FG   = const(0xFFFF)   # WHITE
+_SEP_COLOR  = const(0x39E7)   # color565(60, 60, 60) -- dark gray
+_ADV_COLOR  = const(0xFFE0)   # YELLOW
+_CONN_COLOR = const(0x07E0)   # GREEN
+_DISC_COLOR = const(0xF800)   # RED
+_LOG_FG     = const(0x07FF)   # CYAN
+_BG         = const(0x0000)   # BLACK
+_LABEL_FG   = const(0xFFFF)   # WHITE
+
+
+def _swap565(color):
+    """Byte-swap an RGB565 color: framebuf stores pixels little-endian,
+    the ST7789 expects big-endian."""
+    return ((color & 0xFF) << 8) | (color >> 8)
 
 
 class DisplayManager:
@@ -88,7 +105,35 @@ class DisplayManager:
             rotation=0,
             color_order=st7789.BGR,
         )
-        self._log_buf = []
+        # Off-screen RGB565 zones, built in RAM and pushed to the panel
+        # with a single blit_buffer() instead of fill_rect + per-glyph writes
+        self._log_fb_buf = bytearray(_WIDTH * _LOG_H * 2)
+        self._log_fb = framebuf.FrameBuffer(
+            self._log_fb_buf, _WIDTH, _LOG_H, framebuf.RGB565)
+        self._status_fb_buf = bytearray(_WIDTH * _STATUS_ZONE_H * 2)
+        self._status_fb = framebuf.FrameBuffer(
+            self._status_fb_buf, _WIDTH, _STATUS_ZONE_H, framebuf.RGB565)
+        self._palette = framebuf.FrameBuffer(bytearray(4), 2, 1, framebuf.RGB565)
+        self._font_buf = bytearray(font.FONT)  # FrameBuffer needs writable memory
+        self._glyphs = {}
+        # Title and separators never change: render them once here
+        self._title_buf = bytearray(_WIDTH * _TITLE_H * 2)
+        title_fb = framebuf.FrameBuffer(
+            self._title_buf, _WIDTH, _TITLE_H, framebuf.RGB565)
+        title_fb.fill(_swap565(_TITLE_BG))
+        self._fb_center_text(title_fb, "Cortex-Link", 0, _TITLE_FG, _TITLE_BG)
+        self._fb_center_text(title_fb, "BLE Bridge", _CHAR_H, _TITLE_FG, _TITLE_BG)
+        self._sep_buf = bytearray(_WIDTH * 2)
+        framebuf.FrameBuffer(
+            self._sep_buf, _WIDTH, 1, framebuf.RGB565).fill(_swap565(_SEP_COLOR))
+        # Log ring: fixed text slots reused forever, so logging allocates
+        # nothing long-lived. _log_head is the slot of the oldest line.
+        self._log_text = bytearray(_MAX_LOG_LINES * _LOG_COLS)
+        self._log_len = bytearray(_MAX_LOG_LINES)
+        self._log_head = 0
+        self._log_count = 0
+        self._dirty = False         # Log has lines not yet on screen
+        self._log_drawn = 0         # Lines currently valid on screen
         self.menu_active = False
         self._tool_panel = None
         try:
@@ -96,13 +141,16 @@ class DisplayManager:
             self._tool_panel = ToolPanel(font)
         except Exception as e:
             print("display: tool_icons load failed:", e)
-        gc.collect()
 
     @property
     def tft(self):
         """Expose ST7789 instance for direct rendering (used by menu_ui)."""
         return self._tft
 
+    def fb_text(self, fb, string, x, y, fg, bg):
+        """Render text into an off-screen framebuffer (used by menu_ui)."""
+        self._fb_text(fb, string, x, y, fg, bg)
+
     # --- Public API ---
 
     def show_startup(self):
@@ -140,16 +188,51 @@ class DisplayManager:
         self.log("Disconnected")
 
     def log(self, message):
-        """Add a message to the scrolling event log.
-        Always buffers; skips rendering when menu is active."""
-        max_msg = _CHARS_PER_LINE - 2  # Room for "> " prefix
-        if len(message) > max_msg:
-            message = message[:max_msg]
-        self._log_buf.append(message)
-        if len(self._log_buf) > _MAX_LOG_LINES:
-            self._log_buf.pop(0)
-        if not self.menu_active:
-            self._draw_log()
+        """Add a message (str or bytes) to the scrolling event log.
+        Only buffers; the redraw happens on the next flush() so that
+        back-to-back log lines cost a single SPI update."""
+        if isinstance(message, str):
+            message = message.encode()
+        n = min(len(message), _LOG_COLS)
+        if self._log_count == _MAX_LOG_LINES:
+            # Overwrite the oldest slot; lines shift up -- full redraw needed
+            slot = self._log_head
+            self._log_head = (slot + 1) % _MAX_LOG_LINES
+            self._log_drawn = 0
+        else:
+            slot = (self._log_head + self._log_count) % _MAX_LOG_LINES
+            self._log_count += 1
+        start = slot * _LOG_COLS
+        self._log_text[start:start + n] = memoryview(message)[:n]
+        self._log_len[slot] = n
+        self._dirty = True
+
+    def log_many(self, messages):
+        """Add several messages to the event log as one batch.
+        Renders once when the batch is flushed."""
+        for message in messages:
+            self.log(message)
+
+    def flush(self):
+        """Render pending log lines now. Skipped while the menu is active."""
+        if self._dirty and not self.menu_active:
+            self._dirty = False
+            y, h = self._render_log(False)
+            self._tft.blit_buffer(self._log_rows(y, h), 0, _LOG_Y + y, _WIDTH, h)
+
+    async def flusher(self):
+        """Run forever, flushing batched log lines. Schedule with
+        asyncio.create_task().
+
+        Unlike flush(), the pixels are pushed in slices that yield to the
+        event loop, so a full log repaint doesn't stall BLE handling."""
+        while True:
+            await asyncio.sleep_ms(_FLUSH_MS)
+            if self._dirty and not self.menu_active:
+                self._dirty = False
+                y, h = self._render_log(False)
+                await self._blit_async(
+                    self._log_rows(y, h), 0, _LOG_Y + y, _WIDTH, h)
 
     def tool_triggered(self, cmd_name):
         """Flash the icon for a Cortex tool command.
@@ -181,6 +264,7 @@ class DisplayManager:
             self._draw_status("Advertising...", _ADV_COLOR)
         self._draw_separator(_SEP2_Y)
         self._draw_log()
+        self._dirty = False
         if self._tool_panel:
             self._tool_panel.draw_all(self._tft)
 
@@ -188,35 +272,110 @@ class DisplayManager:
 
     def _draw_title(self):
         """Render the title zone (dark blue background, white text)."""
-        self._tft.fill_rect(0, 0, _WIDTH, _TITLE_H, _TITLE_BG)
-        self._center_text("Cortex-Link", 0, _TITLE_FG, _TITLE_BG)
-        self._center_text("BLE Bridge", _CHAR_H, _TITLE_FG, _TITLE_BG)
+        self._tft.blit_buffer(self._title_buf, 0, 0, _WIDTH, _TITLE_H)
 
     def _draw_separator(self, y):
         """Draw a 1px horizontal separator line."""
-        self._tft.hline(0, y, _WIDTH, _SEP_COLOR)
+        self._tft.blit_buffer(self._sep_buf, 0, y, _WIDTH, 1)
 
     def _draw_status(self, text, color):
         """Clear and redraw the status zone between the two separators."""
-        # Clear the zone (between sep1 and sep2, excluding separator pixels)
-        self._tft.fill_rect(0, _SEP1_Y + 1, _WIDTH, _SEP2_Y - _SEP1_Y - 1, _BG)
+        # Build the zone (between sep1 and sep2, excluding separator pixels)
+        fb = self._status_fb
+        fb.fill(_swap565(_BG))
+        y = _STATUS_Y - _STATUS_ZONE_Y
         # Draw "Status: " label in white
         label = "Status: "
-        self._tft.text(font, label, 0, _STATUS_Y, _LABEL_FG, _BG)
+        self._fb_text(fb, label, 0, y, _LABEL_FG, _BG)
         # Draw the status text in the appropriate color
         x_offset = len(label) * _CHAR_W
-        self._tft.text(font, text, x_offset, _STATUS_Y, color, _BG)
+        self._fb_text(fb, text, x_offset, y, color, _BG)
+        self._tft.blit_buffer(
+            self._status_fb_buf, 0, _STATUS_ZONE_Y, _WIDTH, _STATUS_ZONE_H)
 
     def _draw_log(self):
         """Redraw the log zone from the ring buffer (above icon panel)."""
-        # Clear log zone only (between sep2 and icon panel)
-        self._tft.fill_rect(0, _LOG_Y, _WIDTH, _ICON_PANEL_Y - _LOG_Y, _BG)
-        # Draw each entry
-        for i, msg in enumerate(self._log_buf):
-            y = _LOG_Y + i * _CHAR_H
-            self._tft.text(font, "> " + msg, 0, y, _LOG_FG, _BG)
-
-    def _center_text(self, string, y, fg, bg):
-        """Draw text horizontally centered on the given y line."""
+        self._render_log(True)
+        self._tft.blit_buffer(self._log_fb_buf, 0, _LOG_Y, _WIDTH, _LOG_H)
+
+    def _render_log(self, full):
+        """Render log lines into the log framebuffer.
+
+        Unless a full repaint is requested (or the log has scrolled), only
+        lines appended since the last render are drawn. Returns the
+        (y, height) pixel band of the zone that needs pushing."""
+        fb = self._log_fb
+        first = 0 if full else self._log_drawn
+        if not first:
+            fb.fill(_swap565(_BG))
+            full = True
+        count = self._log_count
+        text = memoryview(self._log_text)
+        for i in range(first, count):
+            slot = (self._log_head + i) % _MAX_LOG_LINES
+            start = slot * _LOG_COLS
+            y = i * _CHAR_H
+            self._fb_text(fb, b"> ", 0, y, _LOG_FG, _BG)
+            self._fb_text(fb, text[start:start + self._log_len[slot]],
+                          2 * _CHAR_W, y, _LOG_FG, _BG)
+        self._log_drawn = count
+        if full:
+            return 0, _LOG_H
+        return first * _CHAR_H, (count - first) * _CHAR_H
+
+    def _log_rows(self, y, height):
+        """Slice of the log buffer covering rows y..y+height (contiguous)."""
+        return memoryview(self._log_fb_buf)[y * _WIDTH * 2:(y + height) * _WIDTH * 2]
+
+    async def _blit_async(self, buf, x, y, width, height):
+        """blit_buffer() in _ASYNC_ROWS slices, yielding between slices.
+
+        Each slice sets its own window, so a synchronous draw that runs
+        while we're yielded can't corrupt the remainder. Stops early if the
+        menu takes over the screen (it redraws everything on exit)."""
+        mv = memoryview(buf)
+        row_bytes = width * 2
+        row = 0
+        while row < height:
+            rows = min(_ASYNC_ROWS, height - row)
+            start = row * row_bytes
+            self._tft.blit_buffer(
+                mv[start:start + rows * row_bytes], x, y + row, width, rows)
+            row += rows
+            if row < height:
+                await asyncio.sleep_ms(0)
+                if self.menu_active:
+                    return
+
+    def _glyph(self, code):
+        """Return a cached 1bpp FrameBuffer for one character code, or None."""
+        g = self._glyphs.get(code)
+        if g is None:
+            if not font.FIRST <= code < font.LAST:
+                return None
+            start = (code - font.FIRST) * _GLYPH_BYTES
+            g = framebuf.FrameBuffer(
+                memoryview(self._font_buf)[start:start + _GLYPH_BYTES],
+                _CHAR_W, _CHAR_H, framebuf.MONO_HLSB)
+            self._glyphs[code] = g
+        return g
+
+    def _fb_text(self, fb, string, x, y, fg, bg):
+        """Render text (str or bytes-like) into an off-screen framebuffer
+        using the display font. Characters the font lacks are skipped,
+        as in st7789py's text()."""
+        if isinstance(string, str):
+            string = string.encode()
+        pal = self._palette
+        pal.pixel(0, 0, _swap565(bg))
+        pal.pixel(1, 0, _swap565(fg))
+        for code in string:
+            g = self._glyph(code)
+            if g:
+                fb.blit(g, x, y, -1, pal)
+                x += _CHAR_W
+
+    def _fb_center_text(self, fb, string, y, fg, bg):
+        """Render text horizontally centered on the given framebuffer line."""
         x = (_WIDTH - len(string) * _CHAR_W) // 2
-        self._tft.text(font, string, x, y, fg, bg)
+        self._fb_text(fb, string, x, y, fg, bg)
@@ -5,7 +5,6 @@ Keys are stored in /sd/keys.json as:
     {"keys": [{"name": "OpenAI", "value": "sk-abc123..."}, ...]}
 """
 
-import gc
 import json
 
 
@@ -15,50 +14,82 @@ _KEYS_FILE = "/sd/keys.json"
 class KeyStore:
     def __init__(self, sd_manager):
         self._sd = sd_manager
+        self._cache = None   # Parsed keys list, valid while _sig matches
+        self._sig = None     # (size, mtime) of keys.json when cached
+        self._by_name = {}   # name -> key dict, built alongside _cache
+        self._names = []     # list_keys() result, built alongside _cache
+
+    def _file_sig(self):
+        """(size, mtime) of the keys file, or None if it doesn't exist."""
+        st = self._sd.stat(_KEYS_FILE)
+        if st is None:
+            return None
+        return (st[6], st[8])
+
+    def _set_cache(self, keys, sig):
+        self._cache = keys
+        self._sig = sig
+        by_name = {}
+        for k in keys:
+            name = k.get("name")
+            if name not in by_name:  # First entry wins, as in a linear scan
+                by_name[name] = k
+        self._by_name = by_name
+        self._names = [k.get("name", "?") for k in keys]
 
     def _load(self):
-        """Load keys list from SD. Returns [] on any failure."""
+        """Load keys list from SD. Returns [] on any failure.
+        Re-reads the file only when its size or mtime has changed."""
         if not self._sd or not self._sd.is_mounted:
             return []
-        data = self._sd.read_file(_KEYS_FILE)
-        if data is None:
+        sig = self._file_sig()
+        if sig is None:
+            self._set_cache([], None)
             return []
+        if self._cache is not None and sig == self._sig:
+            return self._cache
         try:
-            obj = json.loads(data)
-            gc.collect()
-            return obj.get("keys", [])
-        except (ValueError, KeyError):
+            obj = self._sd.read_json(_KEYS_FILE)
+            if obj is None:
+                return []
+            keys = obj.get("keys", [])
+        except (ValueError, KeyError, AttributeError):
             return []
+        self._set_cache(keys, sig)
+        return keys
 
     def _save(self, keys):
-        """Save keys list to SD."""
+        """Save keys list to SD and seed the cache with it, so the next
+        read doesn't go back to the card. Returns True on success."""
         data = json.dumps({"keys": keys})
-        self._sd.write_file(_KEYS_FILE, data)
-        gc.collect()
+        if self._sd.write_file(_KEYS_FILE, data):
+            self._set_cache(keys, self._file_sig())
+            return True
+        self._cache = None  # Unknown file state -- reload on next access
+        return False
 
     def list_keys(self):
-        """Return list of key name strings."""
-        return [k.get("name", "?") for k in self._load()]
+        """Return list of key name strings (cached; treat as read-only)."""
+        if not self._load():
+            return []
+        return self._names
 
     def get_key(self, name):
         """Return key dict {"name":..., "value":...} or None."""
-        for k in self._load():
-            if k.get("name") == name:
-                return k
-        return None
+        if not self._load():
+            return None
+        return self._by_name.get(name)
 
     def add_key(self, name, value):
         """Add a new key. Returns True on success."""
-        keys = self._load()
-        keys.append({"name": name, "value": value})
-        self._save(keys)
-        return True
+        # Build a new list -- _load() may return the cached one
+        keys = self._load() + [{"name": name, "value": value}]
+        return self._save(keys)
 
     def delete_key(self, name):
         """Delete a key by name. Returns True if found and deleted."""
         keys = self._load()
         new_keys = [k for k in keys if k.get("name") != name]
         if len(new_keys) < len(keys):
-            self._save(new_keys)
-            return True
+            return self._save(new_keys)
         return False
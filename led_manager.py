@@ -9,6 +9,18 @@ from machine import Pin
 from neopixel import NeoPixel
 
 
+# Named status colours (unscaled RGB)
+_PRESETS = (
+    ("startup", (255, 255, 255)),
+    ("advertising", (0, 0, 255)),
+    ("connected", (0, 255, 0)),
+    ("disconnected", (255, 0, 0)),
+    ("error", (255, 0, 0)),
+    ("sd_activity", (255, 200, 0)),
+    ("rx", (0, 255, 255)),
+)
+
+
 class LEDManager:
     def __init__(self, pin=38, n=1, brightness=0.3):
         """Initialise the NeoPixel strip.
@@ -21,6 +33,8 @@ class LEDManager:
         self._np = NeoPixel(Pin(pin, Pin.OUT), n)
         self._n = n
         self._brightness = max(0.0, min(1.0, brightness))
+        self._cur = None  # Last scaled (r, g, b) written to the strip
+        self._scale_presets()
         self.off()
         print("LED: NeoPixel initialized on GPIO", pin)
 
@@ -32,18 +46,28 @@ class LEDManager:
         """Set all LEDs to the given RGB colour (0-255 per channel).
         Brightness scaling is applied automatically."""
         br = self._brightness
-        r = int(r * br)
-        g = int(g * br)
-        b = int(b * br)
-        for i in range(self._n):
-            self._np[i] = (r, g, b)
-        self._np.write()
+        self._write((int(r * br), int(g * br), int(b * br)))
 
     def off(self):
         """Turn off all LEDs."""
+        self._write((0, 0, 0))
+
+    def _write(self, rgb):
+        """Push an already-scaled colour; skipped if it's already showing."""
+        if rgb == self._cur:
+            return
         for i in range(self._n):
-            self._np[i] = (0, 0, 0)
+            self._np[i] = rgb
         self._np.write()
+        self._cur = rgb
+
+    def _scale_presets(self):
+        """Pre-multiply the preset colours by the current brightness."""
+        br = self._brightness
+        self._presets = {
+            name: (int(r * br), int(g * br), int(b * br))
+            for name, (r, g, b) in _PRESETS
+        }
 
     @property
     def brightness(self):
@@ -52,6 +76,7 @@ class LEDManager:
     @brightness.setter
     def brightness(self, value):
         self._brightness = max(0.0, min(1.0, value))
+        self._scale_presets()
 
     # ------------------------------------------------------------------
     # Named status presets (match BLE events)
@@ -59,28 +84,28 @@ class LEDManager:
 
     def status_startup(self):
         """White -- device is booting."""
-        self.set_color(255, 255, 255)
+        self._write(self._presets["startup"])
 
     def status_advertising(self):
         """Blue -- BLE is advertising, waiting for connection."""
-        self.set_color(0, 0, 255)
+        self._write(self._presets["advertising"])
 
     def status_connected(self):
         """Green -- BLE device connected."""
-        self.set_color(0, 255, 0)
+        self._write(self._presets["connected"])
 
     def status_disconnected(self):
         """Red -- BLE device disconnected."""
-        self.set_color(255, 0, 0)
+        self._write(self._presets["disconnected"])
 
     def status_error(self):
         """Bright red -- an error occurred."""
-        self.set_color(255, 0, 0)
+        self._write(self._presets["error"])
 
     def status_sd_activity(self):
         """Yellow -- SD card read/write in progress."""
-        self.set_color(255, 200, 0)
+        self._write(self._presets["sd_activity"])
 
     def status_rx(self):
         """Cyan -- data received over BLE."""
-        self.set_color(0, 255, 255)
+        self._write(self._presets["rx"])
@@ -0,0 +1,35 @@
+# Frozen-module manifest for a custom MicroPython build.
+#
+# Freezing compiles every module to bytecode at firmware build time, so
+# nothing here is parsed at boot and the bytecode runs from flash instead
+# of the GC heap. Build from the MicroPython esp32 port directory:
+#
+#   make BOARD=ESP32_GENERIC_S3 BOARD_VARIANT=SPIRAM_OCT \
+#        FROZEN_MANIFEST=/path/to/esp32-keymaster/manifest.py
+#
+# On import, copies of these modules on the device filesystem take
+# precedence over the frozen ones, so remove them after flashing (ugit OTA
+# will put .py files back -- fine for trying changes, reflash to get the
+# frozen speedup again). boot.py and main.py are deliberately NOT frozen:
+# MicroPython runs a frozen boot.py/main.py in preference to the
+# filesystem copy, so an OTA update to them would be silently ignored
+# while the updated modules were imported. They stay on the filesystem
+# and main.py just imports app.
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+require("aioble")
+
+module("app.py")
+module("ble_server.py")
+module("serial_bridge.py")
+module("display_manager.py")
+module("menu_ui.py")
+module("tool_icons.py")
+module("st7789py.py")
+module("vga1_8x16.py")
+module("sdcard.py")
+module("sd_manager.py")
+module("key_store.py")
+module("led_manager.py")
+module("button.py")
@@ -23,15 +23,18 @@ import os
 import sys
 import json
 import time
-import socket
-import platform
+import queue
+import functools
 import threading
-from collections import deque
 
 import serial
-import serial.tools.list_ports
 from mcp.server.fastmcp import FastMCP
 
+try:
+    import orjson  # Optional: much faster JSON for large payloads
+except ImportError:
+    orjson = None
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -43,6 +46,34 @@ _TIMEOUT = float(os.environ.get("KEYMASTER_TIMEOUT", "5"))
 # ESP32-S3 USB-CDC vendor ID
 _ESP32_S3_VID = 0x303A
 
+
+# Max received lines kept while nobody reads them (oldest dropped first)
+_RX_QUEUE_MAX = 500
+
+# Protocol reply types that answer a CMD
+_REPLY_TYPES = ("ACK", "RSP", "ERR")
+
+# Raw line prefix -> reply type, checked by the reader before decoding
+_REPLY_TAGS = {b"ACK:": "ACK", b"RSP:": "RSP", b"ERR:": "ERR"}
+
+# Grace period after the reply to an expected command (seconds)
+_REPLY_GRACE = 0.02
+
+# Serial read timeout: how long the idle reader blocks per wakeup (seconds)
+_READ_TIMEOUT = 1.0
+
+# How long an enumerated serial port list stays fresh (seconds)
+_PORTS_TTL = 1.0
+
+# Largest single read taken from the serial driver (bytes)
+_READ_MAX = 4096
+
+# Longest a single serial write may block before failing (seconds)
+_WRITE_TIMEOUT = 2.0
+
+# Largest single write handed to the serial driver (bytes)
+_WRITE_CHUNK = 4096
+
 # ---------------------------------------------------------------------------
 # Serial bridge (computer <-> ESP32 USB)
 # ---------------------------------------------------------------------------
@@ -53,9 +84,20 @@ class _SerialBridge:
 
     def __init__(self):
         self._ser = None
-        self._lock = threading.Lock()
-        self._rx_queue = deque(maxlen=500)
+        # Serialises opening/reopening the port (tool calls and the reader
+        # thread can both hit a dead handle). Writes don't take it: only
+        # the tool thread ever writes. Reentrant so _reconnect -> connect.
+        self._lock = threading.RLock()
+        # (generation, reply_type_or_None, line) tuples; one producer
+        # (reader thread), one consumer (tool call). get(timeout=...) is
+        # the wakeup.
+        self._rx_queue = queue.SimpleQueue()
+        # Bumped by send_and_wait before each send and stamped on every
+        # received line, so older lines can be told apart without
+        # clearing the queue first. Only the tool thread writes it.
+        self._gen = 0
         self._reader_thread = None
+        self._stop = threading.Event()  # Set by disconnect() to end the reader
 
     @property
     def is_connected(self):
@@ -63,95 +105,130 @@ class _SerialBridge:
 
     def connect(self, port=None, baud=None):
         """Open the serial port. Auto-detects ESP32 if port is None."""
-        if self.is_connected:
-            return
-
-        port = port or _PORT or self._find_port()
-        baud = baud or _BAUD
-        if not port:
-            raise ConnectionError(
-                "Cortex Link (ESP32) not found. Set KEYMASTER_PORT env var "
-                "(e.g. COM5 or /dev/ttyACM0) or plug in the device."
-            )
-
-        self._ser = serial.Serial(port, baud, timeout=0.1)
-        # Give ESP32 bridge a moment to settle after port open
-        time.sleep(0.5)
-        self._ser.reset_input_buffer()
-
-        # Start background reader
-        if self._reader_thread is None or not self._reader_thread.is_alive():
-            self._reader_thread = threading.Thread(
-                target=self._reader_loop, daemon=True
-            )
-            self._reader_thread.start()
+        with self._lock:
+            if self.is_connected:
+                return
+
+            port = port or _PORT or self._find_port()
+            baud = baud or _BAUD
+            if not port:
+                raise ConnectionError(
+                    "Cortex Link (ESP32) not found. Set KEYMASTER_PORT env var "
+                    "(e.g. COM5 or /dev/ttyACM0) or plug in the device."
+                )
+
+            self._stop.clear()
+            self._ser = serial.Serial(port, baud, timeout=_READ_TIMEOUT,
+                                      write_timeout=_WRITE_TIMEOUT)
+            # Give ESP32 bridge a moment to settle after port open
+            time.sleep(0.5)
+            self._ser.reset_input_buffer()
+
+            # Start background reader
+            if self._reader_thread is None or not self._reader_thread.is_alive():
+                self._reader_thread = threading.Thread(
+                    target=self._reader_loop, daemon=True
+                )
+                self._reader_thread.start()
 
     def disconnect(self):
+        self._stop.set()
         if self._ser and self._ser.is_open:
             self._ser.close()
         self._ser = None
 
     def send(self, message):
-        """Send a newline-delimited message (no size limit — ESP32 handles chunking)."""
+        """Send a newline-delimited message.
+
+        There's no size limit: Cortex Link chunks long lines for BLE, and
+        on this side large messages go to the driver in _WRITE_CHUNK
+        slices. Accepts str (UTF-8 encoded here) or any bytes-like object,
+        which is written without a second encode pass.
+        """
         self._ensure_connected()
-        if not message.endswith("\n"):
-            message += "\n"
-        encoded = message.encode("utf-8")
+        # Encode first, then terminate the bytes -- appending to the str
+        # would copy it once more before encoding
+        if isinstance(message, str):
+            encoded = message.encode("utf-8")
+        elif isinstance(message, bytes):
+            encoded = message
+        else:
+            # bytearray/memoryview: copy so += can't touch the caller's buffer
+            encoded = bytes(message)
+        if not encoded.endswith(b"\n"):
+            encoded += b"\n"
+        ser = self._ser
         try:
-            with self._lock:
-                self._ser.write(encoded)
+            _write_line(ser, encoded)
+        except ConnectionError:
+            raise
         except (serial.SerialException, PermissionError, OSError):
-            # Stale handle after device reboot — reconnect and retry
-            self._reconnect()
-            with self._lock:
-                self._ser.write(encoded)
+            # Stale handle after device reboot — reconnect and resend the
+            # whole line (the device lost any partial one)
+            self._reconnect(ser)
+            _write_line(self._ser, encoded)
 
-    def send_and_wait(self, message, timeout=None, settle=0.4):
+    def send_and_wait(self, message, timeout=None, settle=0.4, expect=None):
         """Send a message and collect response lines.
 
         After the first response line arrives, waits an additional `settle`
-        seconds for more lines before returning.
+        seconds for more lines before returning. If `expect` names the
+        command being sent, the ACK/RSP/ERR reply for it ends the wait
+        after a short grace period instead.
         """
         timeout = timeout or _TIMEOUT
-        t0 = time.time()
+        t0 = time.monotonic()
 
-        # Drain stale messages
-        self._rx_queue.clear()
+        # Lines stamped with an older generation are stale
+        self._gen += 1
+        gen = self._gen
 
         self.send(message)
 
         lines = []
         deadline = t0 + timeout
-        first_at = None
-
-        while time.time() < deadline:
-            # Collect new messages
-            while self._rx_queue:
-                ts, text = self._rx_queue.popleft()
-                if ts >= t0:
-                    lines.append(text)
-                    if first_at is None:
-                        first_at = time.time()
-
-            # If we have responses and settle window elapsed, done
-            if first_at is not None and (time.time() - first_at) >= settle:
-                # Final drain
-                while self._rx_queue:
-                    ts, text = self._rx_queue.popleft()
-                    if ts >= t0:
-                        lines.append(text)
-                break
+        settle_end = None  # Set once responses start arriving
 
-            time.sleep(0.05)
+        while True:
+            # Block until the next line, the end of the settle window
+            # (once we have responses) or the overall deadline
+            now = time.monotonic()
+            end = deadline if settle_end is None else min(deadline, settle_end)
+            if now >= end:
+                break
+            try:
+                item = self._rx_queue.get(timeout=end - now)
+            except queue.Empty:
+                continue
+            # Take whatever else already arrived in the same wakeup
+            fresh = [(kind, text) for g, kind, text in self._drain([item])
+                     if g >= gen]
+            if not fresh:
+                continue
+            lines.extend(text for _kind, text in fresh)
+            if expect is not None and any(
+                    kind is not None and _is_reply_to(text, expect)
+                    for kind, text in fresh):
+                settle_end = time.monotonic() + _REPLY_GRACE
+            elif settle_end is None:
+                settle_end = time.monotonic() + settle
 
         return lines
 
     def read_pending(self):
-        """Return all buffered messages without sending anything."""
+        """Return all buffered messages without sending anything.
+
+        Takes a snapshot of what was queued at the time of the call;
+        lines the reader adds meanwhile are left for the next call.
+        """
+        q = self._rx_queue
+        get = q.get_nowait
         lines = []
-        while self._rx_queue:
-            _ts, text = self._rx_queue.popleft()
-            lines.append(text)
+        try:
+            for _ in range(q.qsize()):
+                lines.append(get()[2])
+        except queue.Empty:
+            pass
         return lines
 
     @property
@@ -162,63 +239,175 @@ class _SerialBridge:
 
     @property
     def buffered_count(self):
-        return len(self._rx_queue)
+        return self._rx_queue.qsize()
 
     # -- internals --
 
-    def _reconnect(self):
-        """Close stale connection and reopen."""
-        port = self.port_name
+    def _drain(self, items=None):
+        """Remove everything currently queued and return it, appended to
+        `items` if given."""
+        if items is None:
+            items = []
+        get = self._rx_queue.get_nowait
         try:
-            if self._ser:
-                self._ser.close()
-        except Exception:
+            while True:
+                items.append(get())
+        except queue.Empty:
             pass
-        self._ser = None
-        time.sleep(1.0)
-        self.connect(port=port)
+        return items
+
+    def _reconnect(self, stale=None):
+        """Close stale connection and reopen.
+
+        `stale` is the handle that failed; if another thread has already
+        replaced it with a working one, there's nothing to do.
+        """
+        with self._lock:
+            if stale is not None and self._ser is not stale and self.is_connected:
+                return
+            port = self.port_name
+            try:
+                if self._ser:
+                    self._ser.close()
+            except Exception:
+                pass
+            self._ser = None
+            time.sleep(1.0)
+            self.connect(port=port)
 
     def _ensure_connected(self):
         if not self.is_connected:
             self.connect()
 
-    def _find_port(self):
-        """Auto-detect an ESP32-S3 USB-CDC port."""
-        for p in serial.tools.list_ports.comports():
+    def _find_port(self, ports=None):
+        """Auto-detect an ESP32-S3 USB-CDC port.
+
+        `ports` is an already-enumerated comports() list to search;
+        enumerating is slow, so callers that have one should pass it.
+        """
+        if ports is None:
+            ports = _cached_comports()
+        # Integer VID match first; the description scan is only a fallback
+        for p in ports:
             if p.vid == _ESP32_S3_VID:
                 return p.device
-            if p.description and "ESP32" in p.description.upper():
+        for p in ports:
+            desc = p.description
+            if desc and "ESP32" in desc.upper():
                 return p.device
         return None
 
+    def _publish(self, parts):
+        """Queue a batch of raw lines from one read. The generation stamp
+        and queue bound are handled once per batch, not once per line; the
+        reply type is read off the raw bytes so consumers don't have to
+        re-parse every line to find it."""
+        q = self._rx_queue
+        gen = self._gen
+        tags = _REPLY_TAGS
+        for raw in parts:
+            raw = raw.strip()
+            if raw:
+                kind = tags.get(bytes(raw[:4]))
+                q.put((gen, kind, raw.decode("utf-8", errors="replace")))
+        excess = q.qsize() - _RX_QUEUE_MAX
+        try:
+            while excess > 0:
+                q.get_nowait()
+                excess -= 1
+        except queue.Empty:
+            pass
+
     def _reader_loop(self):
         """Background thread: read serial lines into the queue."""
-        buf = b""
-        while True:
+        buf = bytearray()
+        while not self._stop.is_set():
+            ser = self._ser
             try:
-                if self._ser and self._ser.is_open:
-                    chunk = self._ser.read(512)
+                if ser and ser.is_open:
+                    # Block for the first byte (up to _READ_TIMEOUT), then
+                    # take everything else that's already waiting
+                    chunk = ser.read(min(ser.in_waiting, _READ_MAX) or 1)
                     if chunk:
-                        buf += chunk
-                        while b"\n" in buf:
-                            idx = buf.index(b"\n")
-                            line = buf[:idx].decode("utf-8", errors="replace").strip()
-                            buf = buf[idx + 1:]
-                            if line:
-                                self._rx_queue.append((time.time(), line))
+                        waiting = ser.in_waiting
+                        if waiting:
+                            chunk += ser.read(min(waiting, _READ_MAX))
+                        # Only the new bytes can hold a newline -- the
+                        # buffered tail is everything after the last one
+                        buf.extend(chunk)
+                        nl = buf.find(b"\n", len(buf) - len(chunk))
+                        if nl < 0:
+                            continue
+                        start = 0
+                        parts = []
+                        while nl >= 0:
+                            parts.append(buf[start:nl])
+                            start = nl + 1
+                            nl = buf.find(b"\n", start)
+                        # Drop the consumed lines in place, keeping the tail
+                        del buf[:start]
+                        self._publish(parts)
                 else:
                     time.sleep(0.2)
             except (serial.SerialException, PermissionError, OSError):
                 # Port disconnected or device rebooted — try to reconnect
-                buf = b""
+                buf = bytearray()
+                if self._stop.is_set():
+                    break
                 try:
-                    self._reconnect()
+                    self._reconnect(ser)
                 except Exception:
                     time.sleep(2.0)
             except Exception:
                 time.sleep(0.5)
 
 
+def _write_line(ser, data):
+    """_write_all(), with a write timeout reported as ConnectionError."""
+    try:
+        _write_all(ser, data)
+    except serial.SerialTimeoutException as e:
+        # Device stopped draining (flow-controlled or wedged); a
+        # reconnect won't help, so fail the call instead of stalling
+        raise ConnectionError("serial write timed out") from e
+
+
+def _write_all(ser, data):
+    """Write data in bounded slices (memoryview, no copies).
+
+    Advances only by what the driver reports written; a write that makes
+    no progress raises SerialTimeoutException rather than dropping bytes.
+    """
+    n = len(data)
+    mv = memoryview(data)
+    off = 0
+    while off < n:
+        written = ser.write(mv[off:off + _WRITE_CHUNK])
+        if not written:
+            raise serial.SerialTimeoutException(
+                "serial write made no progress")
+        off += written
+
+
+_ports_cache = (0.0, [])
+
+
+def _cached_comports():
+    """comports() list, re-enumerated at most once per _PORTS_TTL.
+
+    Enumeration walks sysfs / SetupAPI and is slow; hot-plug is rare
+    enough that a second-old list is fine for detection and display.
+    """
+    global _ports_cache
+    now = time.monotonic()
+    ts, ports = _ports_cache
+    if now - ts >= _PORTS_TTL:
+        from serial.tools import list_ports
+        ports = list(list_ports.comports())
+        _ports_cache = (now, ports)
+    return ports
+
+
 # Singleton bridge instance
 _bridge = _SerialBridge()
 
@@ -227,65 +416,92 @@ _bridge = _SerialBridge()
 # ---------------------------------------------------------------------------
 
 
+# Compact stdlib encoder, built once; matches orjson's output form
+_json_encode = json.JSONEncoder(separators=(",", ":"),
+                                ensure_ascii=False).encode
+
+
+def _json_dumps(obj):
+    """Serialize to compact UTF-8 JSON bytes (orjson if available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _json_encode(obj).encode("utf-8")
+
+
+def _json_loads(data):
+    """Parse JSON from str or bytes (orjson if available).
+
+    Both backends raise a ValueError subclass on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_pretty(obj):
+    """Indented JSON text for tool output."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+@functools.lru_cache(maxsize=32)
+def _cmd_bare(command):
+    """Encoded, newline-terminated payload-less command (cached)."""
+    return "CMD:{}\n".format(command).encode("utf-8")
+
+
 def _cmd(command, payload=None):
-    """Build a Cortex protocol command string."""
+    """Build a Cortex protocol command.
+
+    Payload-less and dict-payload commands are built straight into bytes
+    so send() can skip the encode step; other forms stay str.
+    """
     if payload is None:
-        return "CMD:{}".format(command)
+        return _cmd_bare(command)
     if isinstance(payload, dict):
-        payload = json.dumps(payload)
+        return b"CMD:" + command.encode("utf-8") + b":" + _json_dumps(payload)
     return "CMD:{}:{}".format(command, payload)
 
 
+def _is_reply_to(line, command):
+    """True if line is an ACK/RSP/ERR for the given command."""
+    kind, sep, rest = line.partition(":")
+    return (sep and kind in _REPLY_TYPES
+            and rest.partition(":")[0] == command)
+
+
 def _parse_response(lines):
     """Parse Cortex protocol response lines into a structured result.
 
-    Returns a dict with 'type' (ACK/RSP/ERR/raw), 'command', 'data', and 'raw'.
+    Returns a dict with 'type' (ACK/RSP/ERR/raw), 'command', 'data', and
+    'lines' (the input list). For the 'raw' type, 'data' is the lines
+    joined with newlines; the join is skipped when a reply line is found.
     """
     if not lines:
         return None
 
-    raw = "\n".join(lines)
-
     for line in lines:
-        if line.startswith("ACK:"):
-            parts = line.split(":", 2)
-            return {
-                "type": "ACK",
-                "command": parts[1] if len(parts) > 1 else "",
-                "data": parts[2] if len(parts) > 2 else "",
-                "raw": raw,
-            }
-        if line.startswith("RSP:"):
-            parts = line.split(":", 2)
-            data_str = parts[2] if len(parts) > 2 else ""
+        kind, sep, rest = line.partition(":")
+        if not sep or kind not in _REPLY_TYPES:
+            continue
+        command, _, data = rest.partition(":")
+        if kind == "RSP":
             # Try to parse JSON payload
             try:
-                data = json.loads(data_str)
-            except (json.JSONDecodeError, ValueError):
-                data = data_str
-            return {
-                "type": "RSP",
-                "command": parts[1] if len(parts) > 1 else "",
-                "data": data,
-                "raw": raw,
-            }
-        if line.startswith("ERR:"):
-            parts = line.split(":", 2)
-            return {
-                "type": "ERR",
-                "command": parts[1] if len(parts) > 1 else "",
-                "data": parts[2] if len(parts) > 2 else "",
-                "raw": raw,
-            }
+                data = _json_loads(data)
+            except ValueError:
+                pass
+        return {"type": kind, "command": command, "data": data, "lines": lines}
 
     # No recognized prefix — return raw
-    return {"type": "raw", "command": "", "data": raw, "raw": raw}
+    return {"type": "raw", "command": "", "data": "\n".join(lines), "lines": lines}
 
 
 def _send_cmd(command, payload=None, timeout=None):
     """Send a Cortex command and return parsed response."""
     msg = _cmd(command, payload)
-    lines = _bridge.send_and_wait(msg, timeout=timeout)
+    lines = _bridge.send_and_wait(msg, timeout=timeout, expect=command)
     resp = _parse_response(lines)
     if resp is None:
         return "No response (timeout). Check Cortex Link and Core are connected."
@@ -296,9 +512,28 @@ def _send_cmd(command, payload=None, timeout=None):
     if resp["type"] == "RSP":
         data = resp["data"]
         if isinstance(data, dict):
-            return json.dumps(data, indent=2)
+            return _json_pretty(data)
         return str(data)
-    return resp["raw"]
+    return resp["data"]
+
+
+@functools.lru_cache(maxsize=1)
+def _host_info():
+    """Host details for session_start / register_computer.
+
+    Computed on first use: they can't change while the server runs,
+    platform.version() is slow on some OSes, and importing socket and
+    platform up front would only delay startup.
+    """
+    import socket
+    import platform
+    os_info = "{} {}".format(platform.system(), platform.release())
+    return {
+        "hostname": socket.gethostname(),
+        "os_info": os_info,
+        "os_info_full": "{} {}".format(os_info, platform.version()),
+        "machine": platform.machine(),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -430,10 +665,11 @@ def session_start(ai_platform: str = "claude") -> str:
         ai_platform: The AI platform name (e.g. "claude", "chatgpt").
     """
     try:
+        host = _host_info()
         payload = {
             "ai_platform": ai_platform,
-            "hostname": socket.gethostname(),
-            "os_info": "{} {}".format(platform.system(), platform.release()),
+            "hostname": host["hostname"],
+            "os_info": host["os_info"],
         }
         return _send_cmd("session_start", payload)
     except Exception as e:
@@ -493,8 +729,8 @@ def query(table: str, filters: str = "", limit: int = 10, order_by: str = "creat
         payload = {"table": table, "limit": limit, "order_by": order_by}
         if filters:
             try:
-                payload["filters"] = json.loads(filters)
-            except (json.JSONDecodeError, ValueError):
+                payload["filters"] = _json_loads(filters)
+            except ValueError:
                 return "Error: 'filters' must be valid JSON (e.g. '{\"project\":\"cortex\"}')"
         return _send_cmd("query", payload, timeout=10)
     except Exception as e:
@@ -509,12 +745,11 @@ def register_computer() -> str:
     Useful for tracking which machines the user works on.
     """
     try:
+        host = _host_info()
         payload = {
-            "hostname": socket.gethostname(),
-            "os_info": "{} {} {}".format(
-                platform.system(), platform.release(), platform.version()
-            ),
-            "platform": platform.machine(),
+            "hostname": host["hostname"],
+            "os_info": host["os_info_full"],
+            "platform": host["machine"],
         }
         return _send_cmd("computer_reg", payload)
     except Exception as e:
@@ -564,8 +799,8 @@ def connection_info() -> str:
     Lists detected serial ports and the active connection details.
     """
     try:
-        # List available ports
-        ports = serial.tools.list_ports.comports()
+        # List available ports (cached, reused for auto-detect)
+        ports = _cached_comports()
         port_list = []
         for p in ports:
             desc = p.description or "unknown"
@@ -586,7 +821,7 @@ def connection_info() -> str:
             info += "Buffered messages: {}".format(_bridge.buffered_count)
         else:
             info += "Status: Not connected"
-            auto = _bridge._find_port()
+            auto = _bridge._find_port(ports)
             if auto:
                 info += "\nAuto-detected ESP32: {}".format(auto)
 
@@ -6,6 +6,9 @@ Renders directly to the ST7789 display via display_manager.
 """
 
 import gc
+import framebuf
+import micropython
+from micropython import const
 import st7789py as st7789
 import vga1_8x16 as font
 
@@ -37,22 +40,54 @@ _BACK_FG = st7789.YELLOW  # "< Back" stands out
 _VAL_FG = st7789.CYAN  # Value suffix color
 _INFO_FG = st7789.color565(100, 100, 100)  # Dim for non-selectable info
 
+# Below this much free heap a full redraw schedules a collection. Several
+# times the largest runtime buffers (4 KB bridge/BLE RX caps, SD append
+# buffer), so the pass lands before one of those growths forces it inline.
+_GC_WATERMARK = const(16 * 1024)
 
-class MenuItem:
-    """Lightweight menu item.
 
-    Kinds:
-        "sub"   - data is callable() -> (title, [MenuItem, ...])
-        "cb"    - data is callable() or None (None = go back)
-        "cycle" - data is {"values": [...], "idx": int, "cb": fn_or_None}
-        "info"  - data is callable() -> str (display-only, not selectable)
+def _swap565(color):
+    """Byte-swap an RGB565 color for framebuf (see display_manager)."""
+    return ((color & 0xFF) << 8) | (color >> 8)
+
+
+# Row backgrounds pre-swapped for the off-screen row buffer
+_ROW_BG = _swap565(_BG)
+_ROW_SEL_BG = _swap565(_SEL_BG)
+_ROW_TITLE_BG = _swap565(_TITLE_BG)
+
+_TITLE_TEXT_Y = (_TITLE_H - _CHAR_H) // 2  # 8
+_FOOTER_TEXT = "Tap=Next  Hold=OK"
+
+
+# --- Item kind codes (one byte per item in a menu's kinds) ---
+_SUB = const(0x73)    # b"s"
+_CB = const(0x63)     # b"c"
+_CYCLE = const(0x79)  # b"y"
+_INFO = const(0x69)   # b"i"
+
+
+def make_menu(labels, kinds, datas):
+    """Build a menu as parallel (labels, kinds, datas) sequences.
+
+    kinds is a bytes with one code per item:
+        b"s" sub   - data is callable() -> (title, make_menu(...))
+        b"c" cb    - data is callable() or None (None = go back)
+        b"y" cycle - data is {"values": [...], "idx": int, "cb": fn_or_None}
+        b"i" info  - data is callable() -> str (display-only, not selectable)
+
+    Builders create this once (static menus can cache it as-is) and the
+    manager pushes it unchanged. Indexing bytes yields an int, so there
+    are no per-item objects beyond the labels and data themselves.
     """
-    __slots__ = ('label', 'kind', 'data')
+    if not len(labels) == len(kinds) == len(datas):
+        raise ValueError("menu sequences differ in length")
+    return (labels, kinds, datas)
+
 
-    def __init__(self, label, kind, data=None):
-        self.label = label
-        self.kind = kind
-        self.data = data
+def _collect(_):
+    """Scheduled collection, run outside the redraw."""
+    gc.collect()
 
 
 class MenuManager:
@@ -61,10 +96,20 @@ class MenuManager:
     def __init__(self, display_manager):
         self._dm = display_manager
         self._tft = display_manager.tft
-        self._stack = []  # [(title, items, sel_idx, scroll_off), ...]
+        self._stack = []  # [(title, (labels, kinds, datas), sel, scroll), ...]
         self._active = False
         self._prev_sel = -1
         self._prev_scroll = -1
+        # One off-screen row: each item is rendered here and pushed with a
+        # single blit_buffer() instead of two SPI windows per glyph
+        self._row_buf = bytearray(_WIDTH * _CHAR_H * 2)
+        self._row_fb = framebuf.FrameBuffer(
+            self._row_buf, _WIDTH, _CHAR_H, framebuf.RGB565)
+        # Bound once: each self._tft.blit_buffer etc. lookup would build
+        # a fresh bound-method object on every row drawn
+        self._row_fill = self._row_fb.fill
+        self._fb_text = display_manager.fb_text
+        self._blit = self._tft.blit_buffer
 
     @property
     def is_active(self):
@@ -74,10 +119,10 @@ class MenuManager:
     # Public navigation API
     # ------------------------------------------------------------------
 
-    def open(self, title, items):
-        """Open the menu system with the given root menu."""
+    def open(self, title, menu):
+        """Open the menu system with the given root make_menu()."""
         self._stack = []
-        self._push(title, items)
+        self._push(title, menu)
         self._active = True
         self._dm.menu_active = True
         self._render_full()
@@ -92,39 +137,41 @@ class MenuManager:
         """Move selection to the next item (wraps around)."""
         if not self._active or not self._stack:
             return
-        title, items, sel, scroll = self._stack[-1]
-        sel = (sel + 1) % len(items)
-        scroll = self._adjust_scroll(sel, scroll, len(items))
-        self._stack[-1] = (title, items, sel, scroll)
+        title, menu, sel, scroll = self._stack[-1]
+        n = len(menu[0])
+        sel = (sel + 1) % n
+        scroll = self._adjust_scroll(sel, scroll, n)
+        self._stack[-1] = (title, menu, sel, scroll)
         self._render_diff()
 
     def on_long_press(self):
         """Select / enter the highlighted item."""
         if not self._active or not self._stack:
             return
-        title, items, sel, scroll = self._stack[-1]
-        item = items[sel]
+        title, menu, sel, scroll = self._stack[-1]
+        kind = menu[1][sel]
+        data = menu[2][sel]
 
-        if item.kind == "sub":
+        if kind == _SUB:
             try:
-                sub_title, sub_items = item.data()
-                self._push(sub_title, sub_items)
+                sub_title, sub_menu = data()
+                self._push(sub_title, sub_menu)
                 self._render_full()
             except Exception as e:
                 print("Menu: submenu error:", e)
-        elif item.kind == "cb":
-            if item.data is None:
+        elif kind == _CB:
+            if data is None:
                 self._pop()
             else:
                 try:
-                    item.data()
+                    data()
                 except Exception as e:
                     print("Menu: callback error:", e)
                 # Refresh current menu in case callback changed state
                 if self._active and self._stack:
                     self._render_full()
-        elif item.kind == "cycle":
-            d = item.data
+        elif kind == _CYCLE:
+            d = data
             d["idx"] = (d["idx"] + 1) % len(d["values"])
             if d.get("cb"):
                 try:
@@ -138,8 +185,8 @@ class MenuManager:
     # Stack management
     # ------------------------------------------------------------------
 
-    def _push(self, title, items):
-        self._stack.append((title, items, 0, 0))
+    def _push(self, title, menu):
+        self._stack.append((title, menu, 0, 0))
         self._prev_sel = -1
         self._prev_scroll = -1
 
@@ -174,29 +221,36 @@ class MenuManager:
         """Complete redraw of the menu screen."""
         if not self._stack:
             return
-        title, items, sel, scroll = self._stack[-1]
+        title, menu, sel, scroll = self._stack[-1]
+        n = len(menu[0])
         tft = self._tft
 
-        # Title bar
-        tft.fill_rect(0, 0, _WIDTH, _TITLE_H, _TITLE_BG)
-        self._center_text(title, 8, _TITLE_FG, _TITLE_BG)
+        # Title bar: plain strips above and below, text row as one blit
+        tft.fill_rect(0, 0, _WIDTH, _TITLE_TEXT_Y, _TITLE_BG)
+        self._push_row(_TITLE_TEXT_Y, title,
+                       (_WIDTH - len(title) * _CHAR_W) // 2,
+                       _TITLE_FG, _TITLE_BG, _ROW_TITLE_BG)
+        tft.fill_rect(0, _TITLE_TEXT_Y + _CHAR_H, _WIDTH,
+                      _TITLE_H - _TITLE_TEXT_Y - _CHAR_H, _TITLE_BG)
 
         # Separator 1
         tft.hline(0, _SEP1_Y, _WIDTH, _SEP_COLOR)
 
-        # Clear items zone
-        tft.fill_rect(0, _ITEMS_Y, _WIDTH, _ITEMS_ZONE_H, _BG)
-
-        # Draw visible items
-        end = min(scroll + _VISIBLE_ITEMS, len(items))
+        # Draw visible items (each row paints its full width)
+        end = min(scroll + _VISIBLE_ITEMS, n)
         for i in range(scroll, end):
             vis = i - scroll
-            self._draw_item(vis, items[i], i == sel)
+            self._draw_item(vis, menu, i, i == sel)
+
+        # Clear the unused rows below a short menu
+        used = (end - scroll) * _CHAR_H
+        if used < _ITEMS_ZONE_H:
+            tft.fill_rect(0, _ITEMS_Y + used, _WIDTH, _ITEMS_ZONE_H - used, _BG)
 
         # Scroll indicators
         if scroll > 0:
             tft.text(font, "^", _WIDTH - _CHAR_W, _ITEMS_Y, _HINT_FG, _BG)
-        if scroll + _VISIBLE_ITEMS < len(items):
+        if scroll + _VISIBLE_ITEMS < n:
             y_last = _ITEMS_Y + (_VISIBLE_ITEMS - 1) * _CHAR_H
             tft.text(font, "v", _WIDTH - _CHAR_W, y_last, _HINT_FG, _BG)
 
@@ -204,18 +258,24 @@ class MenuManager:
         tft.hline(0, _SEP2_Y, _WIDTH, _SEP_COLOR)
 
         # Footer
-        tft.fill_rect(0, _FOOTER_Y, _WIDTH, _CHAR_H, _BG)
-        tft.text(font, "Tap=Next  Hold=OK", 0, _FOOTER_Y, _HINT_FG, _BG)
+        self._push_row(_FOOTER_Y, _FOOTER_TEXT, 0, _HINT_FG, _BG, _ROW_BG)
 
         self._prev_sel = sel
         self._prev_scroll = scroll
-        gc.collect()
+        # There is no idle collector: normal churn is left to MicroPython's
+        # automatic collection (sooner where boot.py could set
+        # gc.threshold()). Only queue an extra pass when the heap is low.
+        if gc.mem_free() < _GC_WATERMARK:
+            try:
+                micropython.schedule(_collect, None)
+            except RuntimeError:
+                pass  # Schedule queue full -- a collection will come anyway
 
     def _render_diff(self):
         """Redraw only the changed items (fast highlight move)."""
         if not self._stack:
             return
-        title, items, sel, scroll = self._stack[-1]
+        title, menu, sel, scroll = self._stack[-1]
 
         if scroll != self._prev_scroll:
             # Scroll offset changed -- full redraw needed
@@ -226,12 +286,12 @@ class MenuManager:
         if self._prev_sel >= 0:
             vis_prev = self._prev_sel - scroll
             if 0 <= vis_prev < _VISIBLE_ITEMS:
-                self._draw_item(vis_prev, items[self._prev_sel], False)
+                self._draw_item(vis_prev, menu, self._prev_sel, False)
 
         # Highlight new selection
         vis_cur = sel - scroll
         if 0 <= vis_cur < _VISIBLE_ITEMS:
-            self._draw_item(vis_cur, items[sel], True)
+            self._draw_item(vis_cur, menu, sel, True)
 
         self._prev_sel = sel
         self._prev_scroll = scroll
@@ -240,43 +300,39 @@ class MenuManager:
         """Redraw a single item by its absolute index (for cycle updates)."""
         if not self._stack:
             return
-        title, items, sel, scroll = self._stack[-1]
+        title, menu, sel, scroll = self._stack[-1]
         vis = abs_idx - scroll
         if 0 <= vis < _VISIBLE_ITEMS:
-            self._draw_item(vis, items[abs_idx], abs_idx == sel)
+            self._draw_item(vis, menu, abs_idx, abs_idx == sel)
 
-    def _draw_item(self, vis_index, item, selected):
-        """Render one menu item at the given visual row."""
+    def _draw_item(self, vis_index, menu, idx, selected):
+        """Render item idx of a packed menu at the given visual row."""
         y = _ITEMS_Y + vis_index * _CHAR_H
 
         if selected:
-            bg, fg = _SEL_BG, _SEL_FG
+            bg, fg, row_bg, prefix = _SEL_BG, _SEL_FG, _ROW_SEL_BG, "> "
         else:
-            bg, fg = _BG, _FG
-
-        # Clear line
-        self._tft.fill_rect(0, y, _WIDTH, _CHAR_H, bg)
-
-        # Prefix
-        prefix = "> " if selected else "  "
+            bg, fg, row_bg, prefix = _BG, _FG, _ROW_BG, "  "
 
         # Build suffix for cycle and info items
+        kind = menu[1][idx]
+        data = menu[2][idx]
         suffix = ""
-        if item.kind == "cycle" and item.data:
-            val = item.data["values"][item.data["idx"]]
+        if kind == _CYCLE and data:
+            val = data["values"][data["idx"]]
             suffix = " [" + val + "]"
-        elif item.kind == "info" and item.data:
+        elif kind == _INFO and data:
             try:
-                suffix = " " + item.data()
+                suffix = " " + data()
             except Exception:
                 suffix = " ?"
 
         # Color overrides
-        if item.kind == "cb" and item.data is None and not selected:
+        if kind == _CB and data is None and not selected:
             fg = _BACK_FG  # "< Back" in yellow when not highlighted
 
         # Assemble text
-        label = item.label
+        label = menu[0][idx]
         max_chars = _CHARS_PER_LINE
         if suffix:
             avail = max_chars - len(prefix) - len(suffix)
@@ -289,9 +345,11 @@ class MenuManager:
             text = prefix + label
 
         text = text[:max_chars]
-        self._tft.text(font, text, 0, y, fg, bg)
-
-    def _center_text(self, string, y, fg, bg):
-        """Draw text horizontally centered."""
-        x = (_WIDTH - len(string) * _CHAR_W) // 2
-        self._tft.text(font, string, x, y, fg, bg)
+        self._push_row(y, text, 0, fg, bg, row_bg)
+
+    def _push_row(self, y, text, x, fg, bg, row_bg):
+        """Render one full-width text row off-screen and blit it at y.
+        row_bg is bg pre-swapped for framebuf (_ROW_* constants)."""
+        self._row_fill(row_bg)
+        self._fb_text(self._row_fb, text, x, 0, fg, bg)
+        self._blit(self._row_buf, 0, y, _WIDTH, _CHAR_H)
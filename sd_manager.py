@@ -10,23 +10,46 @@ Pin mapping from Waveshare schematic:
 """
 
 import os
-import gc
+import json
+import time
 from machine import Pin, SPI
+from micropython import const
 from sdcard import SDCard
 
+# free_space() results are reused this long; statvfs walks the FAT
+_FREE_CACHE_MS = const(2000)
+
+# SPI clock to drop back to when the card misreads at the requested rate
+_SAFE_BAUDRATE = const(10_000_000)
+
+# append_line() flushes an open file once this much is pending, or when an
+# append (or flush_appenders()) finds it unflushed for _APPEND_FLUSH_MS
+_APPEND_FLUSH_BYTES = const(4096)
+_APPEND_FLUSH_MS = const(1000)
+
 
 class SDManager:
     def __init__(self, sck=14, mosi=15, miso=16, cs=21, spi_id=1,
-                 mount_point="/sd"):
+                 mount_point="/sd", baudrate=20_000_000):
         self._sck = sck
         self._mosi = mosi
         self._miso = miso
         self._cs_pin = cs
         self._spi_id = spi_id
         self._mount_point = mount_point
+        self._baudrate = baudrate
         self._spi = None
         self._sd = None
         self._mounted = False
+        self._free = None       # Last free_space() result
+        self._free_ticks = 0    # ticks_ms() when _free was taken
+        self._dirs = {}         # path -> cached os.listdir() result
+        self._appenders = {}    # path -> [file, pending_bytes, ticks] (append_line)
+
+    def _invalidate(self):
+        """Drop cached listings/free space (after writes or remount)."""
+        self._free = None
+        self._dirs = {}
 
     # ------------------------------------------------------------------
     # Mount / unmount
@@ -44,7 +67,8 @@ class SDManager:
                 miso=Pin(self._miso),
             )
             cs = Pin(self._cs_pin, Pin.OUT, value=1)
-            self._sd = SDCard(self._spi, cs, baudrate=10_000_000)
+            self._sd = SDCard(self._spi, cs, baudrate=self._baudrate)
+            self._check_speed()
 
             # Create mount point directory if needed
             try:
@@ -54,8 +78,8 @@ class SDManager:
 
             os.mount(self._sd, self._mount_point)
             self._mounted = True
+            self._invalidate()
             print("SD: mounted at", self._mount_point)
-            gc.collect()
             return True
         except OSError as e:
             print("SD: mount failed:", e)
@@ -66,9 +90,25 @@ class SDManager:
             self._cleanup()
             return False
 
+    def _check_speed(self):
+        """Read block 0 back at the data rate; if it doesn't carry the
+        0x55AA boot signature, drop the bus to _SAFE_BAUDRATE."""
+        if self._baudrate <= _SAFE_BAUDRATE:
+            return
+        buf = bytearray(512)
+        try:
+            self._sd.readblocks(0, buf)
+            if buf[510] == 0x55 and buf[511] == 0xAA:
+                return
+        except OSError:
+            pass
+        print("SD: unreliable at", self._baudrate, "Hz, using", _SAFE_BAUDRATE)
+        self._sd.init_spi(_SAFE_BAUDRATE)
+
     def unmount(self):
         """Unmount the filesystem and release SPI."""
         if self._mounted:
+            self.close_appenders()
             try:
                 os.umount(self._mount_point)
                 print("SD: unmounted")
@@ -85,8 +125,10 @@ class SDManager:
             except Exception:
                 pass
             self._spi = None
+        self._appenders = {}  # Handles are dead once the card is gone
         self._sd = None
         self._mounted = False
+        self._invalidate()
 
     # ------------------------------------------------------------------
     # Properties
@@ -105,14 +147,21 @@ class SDManager:
     # ------------------------------------------------------------------
 
     def list_files(self, path=None):
-        """List files at the given path (defaults to mount point)."""
+        """List files at the given path (defaults to mount point).
+        Listings are cached until the next write through this manager;
+        treat the returned list as read-only."""
         if not self._mounted:
             print("SD: not mounted")
             return []
         if path is None:
             path = self._mount_point
+        files = self._dirs.get(path)
+        if files is not None:
+            return files
         try:
-            return os.listdir(path)
+            files = os.listdir(path)
+            self._dirs[path] = files
+            return files
         except OSError as e:
             print("SD: list error:", e)
             return []
@@ -127,11 +176,44 @@ class SDManager:
         except OSError:
             return False
 
+    def stat(self, path):
+        """Return os.stat() for a path on the SD card, or None.
+        Pending append_line() data for the path is flushed first so the
+        size is current."""
+        if not self._mounted:
+            return None
+        a = self._appenders.get(path)
+        if a is not None and a[1]:
+            try:
+                self._flush_appender(a, time.ticks_ms())
+            except OSError as e:
+                print("SD: flush error:", e)
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    def read_json(self, path):
+        """Parse a JSON file straight from the file stream (no full-file
+        string). Returns None if the file can't be read; raises ValueError
+        on malformed JSON."""
+        if not self._mounted:
+            print("SD: not mounted")
+            return None
+        self._close_appender(path)
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except OSError as e:
+            print("SD: read error:", e)
+            return None
+
     def read_file(self, path):
         """Read an entire file and return its contents as a string."""
         if not self._mounted:
             print("SD: not mounted")
             return None
+        self._close_appender(path)
         try:
             with open(path, "r") as f:
                 return f.read()
@@ -145,9 +227,11 @@ class SDManager:
         if not self._mounted:
             print("SD: not mounted")
             return False
+        self._close_appender(path)
         try:
             with open(path, "w") as f:
                 f.write(data)
+            self._invalidate()
             return True
         except OSError as e:
             print("SD: write error:", e)
@@ -158,24 +242,99 @@ class SDManager:
         if not self._mounted:
             print("SD: not mounted")
             return False
+        self._close_appender(path)
         try:
             with open(path, "a") as f:
                 f.write(data)
+            self._invalidate()
+            return True
+        except OSError as e:
+            print("SD: append error:", e)
+            return False
+
+    def append_line(self, path, data):
+        """Append a string to a file that is kept open between calls.
+
+        For frequent small appends (logs): skips the open/close FAT
+        updates append_file() pays per call. Data is flushed once
+        _APPEND_FLUSH_BYTES are pending, or by the next append after
+        _APPEND_FLUSH_MS -- nothing flushes on a timer, so call
+        flush_appenders() from an idle path to bound what a reset loses.
+        Reads and writes of the same path, unmount() and close_appenders()
+        close the handle; stat() flushes it. Returns True on success."""
+        if not self._mounted:
+            print("SD: not mounted")
+            return False
+        try:
+            a = self._appenders.get(path)
+            now = time.ticks_ms()
+            if a is None:
+                a = [open(path, "a"), 0, now]
+                self._appenders[path] = a
+                self._invalidate()
+            a[0].write(data)
+            a[1] += len(data)
+            if (a[1] >= _APPEND_FLUSH_BYTES
+                    or time.ticks_diff(now, a[2]) >= _APPEND_FLUSH_MS):
+                self._flush_appender(a, now)
             return True
         except OSError as e:
             print("SD: append error:", e)
+            self._close_appender(path)
             return False
 
+    def flush_appenders(self):
+        """Flush append_line() data left pending for _APPEND_FLUSH_MS.
+        Cheap when nothing is pending; meant for the caller's idle path."""
+        if not self._appenders:
+            return
+        now = time.ticks_ms()
+        for path, a in self._appenders.items():
+            if a[1] and time.ticks_diff(now, a[2]) >= _APPEND_FLUSH_MS:
+                try:
+                    self._flush_appender(a, now)
+                except OSError as e:
+                    print("SD: flush error:", e)
+
+    def _flush_appender(self, a, now):
+        """Flush one append_line() handle and reset its pending count."""
+        a[0].flush()
+        a[1] = 0
+        a[2] = now
+        self._free = None
+
+    def close_appenders(self):
+        """Flush and close every file held open by append_line()."""
+        for path in list(self._appenders):
+            self._close_appender(path)
+
+    def _close_appender(self, path):
+        """Close path's append_line() handle, if one is open."""
+        a = self._appenders.pop(path, None)
+        if a is not None:
+            try:
+                a[0].close()
+            except OSError as e:
+                print("SD: close error:", e)
+            self._free = None
+
     def free_space(self):
-        """Return (free_bytes, total_bytes) for the SD card, or None."""
+        """Return (free_bytes, total_bytes) for the SD card, or None.
+        Cached for _FREE_CACHE_MS; writes through this manager reset it."""
         if not self._mounted:
             return None
+        now = time.ticks_ms()
+        if (self._free is not None
+                and time.ticks_diff(now, self._free_ticks) < _FREE_CACHE_MS):
+            return self._free
         try:
             stat = os.statvfs(self._mount_point)
             block_size = stat[0]
             total_blocks = stat[2]
             free_blocks = stat[3]
-            return (free_blocks * block_size, total_blocks * block_size)
+            self._free = (free_blocks * block_size, total_blocks * block_size)
+            self._free_ticks = now
+            return self._free
         except OSError as e:
             print("SD: statvfs error:", e)
             return None
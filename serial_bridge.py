@@ -21,6 +21,31 @@ _CHUNK_SIZE = 200        # Safe BLE notification MTU chunk size
 _CHUNK_PAYLOAD = _CHUNK_SIZE - 1  # Messages > this use CHUNK:n/N: protocol
 _BUF_OVERFLOW = 4096     # Clear buffer if this big without \n
 _CHUNK_TIMEOUT_MS = 15000 # Discard incomplete chunk sequences after 15s
+_IDLE_SLEEP_MAX_MS = 20  # run() backs off to this between polls when idle
+_PREVIEW_LEN = 40        # Bytes of a line shown in activity previews
+
+# Byte-level USB-CDC writer (MicroPython's stdout also accepts bytes)
+_stdout_write = getattr(sys.stdout, "buffer", sys.stdout).write
+
+# Byte-level USB-CDC reader: fills a buffer, no str decode/encode
+_stdin_readinto = getattr(sys.stdin, "buffer", sys.stdin).readinto
+
+
+def _noop(direction, message):
+    """Default on_activity: lets call sites skip the None check."""
+
+
+def _preview(data, begin=0):
+    """Decode up to _PREVIEW_LEN bytes of data (bytes-like) from begin.
+
+    The cut is backed off to a UTF-8 start byte, as _send_chunked does:
+    MicroPython's decode ignores "replace" and raises on a split character.
+    """
+    end = begin + _PREVIEW_LEN
+    if end < len(data):
+        while end > begin and (data[end] & 0xC0) == 0x80:
+            end -= 1
+    return bytes(data[begin:end]).decode("utf-8", "replace")
 
 
 class SerialBridge:
@@ -32,152 +57,242 @@ class SerialBridge:
                          direction is "serial_in" or "ble_in".
         """
         self._ble = ble_server
-        self._on_activity = on_activity
+        self._on_activity = on_activity or _noop
         self._poll = select.poll()
         self._poll.register(sys.stdin, select.POLLIN)
+        # Bound once: the run() loop and the send path call these per pass
+        # or per line, and each attribute lookup builds a new bound method
+        self._poll_poll = self._poll.poll
+        self._ble_send = ble_server.send_raw
         self._buf = bytearray()
+        self._rx_byte = bytearray(1)  # readinto() target for stdin
+        self._out = bytearray()       # USB-bound bytes, written once per run() pass
+        # Outbound CHUNK packet, refilled for every chunk; safe to reuse
+        # because the GATT write copies it before send_raw returns
+        self._tx_pkt = bytearray(_CHUNK_SIZE)
+        self._tx_mv = memoryview(self._tx_pkt)
 
         # Inbound chunk reassembly state
-        self._chunk_buf = {}    # {chunk_num: data_bytes}
+        self._chunk_parts = None  # [data or None] * total, by chunk number - 1
+        self._chunk_count = 0     # Distinct chunks received so far
         self._chunk_total = 0
         self._chunk_ts = 0      # Timestamp of first chunk received
         print("Bridge: initialized")
 
     def on_ble_receive(self, server, message, connection):
-        """BLE RX -> USB Serial. Wired as BLEServer's on_receive callback."""
+        """BLE RX -> USB Serial. Wired as BLEServer's on_receive callback.
+
+        message is the raw line as bytes; it is forwarded without decoding.
+        """
         # Check for chunked message from Core
-        if message.startswith("CHUNK:"):
+        if message.startswith(b"CHUNK:"):
             self._handle_inbound_chunk(message)
             return
 
-        line = message if message.endswith("\n") else message + "\n"
-        sys.stdout.write(line)
-        if self._on_activity:
-            try:
-                self._on_activity("ble_in", message.rstrip("\n"))
-            except Exception:
-                pass
+        self._emit(message)
+        try:
+            self._on_activity("ble_in", _preview(message).rstrip("\n"))
+        except Exception:
+            pass
 
     def _handle_inbound_chunk(self, message):
-        """Reassemble CHUNK:n/N:data messages from Core."""
-        try:
-            # Parse CHUNK:n/N:data
-            rest = message[6:]  # Strip "CHUNK:"
-            header, data = rest.split(":", 1)
-            n_str, total_str = header.split("/")
-            n = int(n_str)
-            total = int(total_str)
-        except (ValueError, IndexError):
+        """Reassemble CHUNK:n/N:data messages from Core.
+
+        message is raw bytes; chunk data stays bytes through reassembly
+        and the USB write, so nothing is decoded and re-encoded.
+        """
+        # Parse CHUNK:n/N:data by position (after the 6-byte "CHUNK:"),
+        # so a malformed header is caught by bounds checks rather than by
+        # raising and unwinding
+        n = total = 0
+        colon = message.find(b":", 6)
+        slash = message.find(b"/", 6, colon) if colon > 0 else -1
+        if 6 < slash < colon - 1:
+            try:
+                n = int(message[6:slash])
+                total = int(message[slash + 1:colon])
+            except ValueError:
+                total = 0  # Non-numeric field
+        if not 0 < n <= total:
             # Malformed chunk — forward as raw
-            line = "RAW:" + message + "\n"
-            sys.stdout.write(line)
+            self._emit(b"RAW:" + message)
             return
+        data = message[colon + 1:]
 
         now = time.ticks_ms()
 
         # New sequence or different total — reset
         if total != self._chunk_total or (self._chunk_ts and
                 time.ticks_diff(now, self._chunk_ts) > _CHUNK_TIMEOUT_MS):
-            self._chunk_buf = {}
+            self._chunk_parts = [None] * total
+            self._chunk_count = 0
             self._chunk_total = total
             self._chunk_ts = now
 
         if not self._chunk_ts:
             self._chunk_ts = now
 
-        self._chunk_buf[n] = data
+        parts = self._chunk_parts
+        if parts[n - 1] is None:
+            self._chunk_count += 1
+        parts[n - 1] = data  # A repeated chunk replaces, never double-counts
 
         # Check if we have all chunks
-        if len(self._chunk_buf) == total:
-            # Reassemble in order
-            full_msg = ""
-            for i in range(1, total + 1):
-                full_msg += self._chunk_buf.get(i, "")
-            self._chunk_buf = {}
+        if self._chunk_count == total:
+            self._chunk_parts = None
+            self._chunk_count = 0
             self._chunk_total = 0
             self._chunk_ts = 0
 
-            line = full_msg if full_msg.endswith("\n") else full_msg + "\n"
-            sys.stdout.write(line)
-            if self._on_activity:
-                try:
-                    self._on_activity("ble_in", full_msg.rstrip("\n")[:40])
-                except Exception:
-                    pass
+            # Reassemble in order straight into the USB output buffer --
+            # the whole message never exists as a separate object
+            out = self._out
+            begin = len(out)
+            for part in parts:
+                out.extend(part)
+            if len(out) == begin or out[-1] != 10:
+                out.append(10)
+            try:
+                self._on_activity("ble_in", _preview(out, begin).rstrip("\n"))
+            except Exception:
+                pass
+
+    def _emit(self, line):
+        """Queue a line for USB serial, adding the \n if it's missing.
+        run() writes everything queued in a single call per pass."""
+        out = self._out
+        out.extend(line)
+        if not line.endswith(b"\n"):
+            out.append(10)
+
+    def _flush_out(self):
+        """Write the queued USB serial output in one call."""
+        out = self._out
+        if out:
+            _stdout_write(out)
+            out[:] = b""
 
     async def run(self):
-        """USB Serial -> BLE TX async loop. Add to asyncio.gather()."""
+        """USB Serial -> BLE TX async loop. Schedule with asyncio.create_task()."""
         print("Bridge: serial reader started")
         # Flush any boot output that accumulated in stdin
         await asyncio.sleep_ms(500)
-        while self._poll.poll(0):
+        while self._poll_poll(0):
             try:
-                sys.stdin.read(1)
+                _stdin_readinto(self._rx_byte)
             except Exception:
                 break
         self._buf = bytearray()
         print("Bridge: stdin flushed, ready")
+        # Sleep between passes: 1 ms while traffic flows, doubling up to
+        # _IDLE_SLEEP_MAX_MS while idle so the loop stops waking every ms
+        sleep = 1
         while True:
             # Non-blocking poll — poll(timeout) blocks the event loop
             # and starves BLE rx_task on ESP32 USB-CDC
-            events = self._poll.poll(0)
-            if events:
+            if self._poll_poll(0):
                 self._read_available()
-            self._process_buffer()
+                # Lines only complete when new bytes arrive
+                self._process_buffer()
+                sleep = 1
+            elif sleep < _IDLE_SLEEP_MAX_MS:
+                sleep = min(sleep * 2, _IDLE_SLEEP_MAX_MS)
             # Check for stale inbound chunks
-            self._check_chunk_timeout()
-            await asyncio.sleep_ms(1)  # Yield to event loop
+            if self._chunk_ts:
+                self._check_chunk_timeout()
+            # BLE RX lines queued since the last pass go out together
+            if self._out:
+                self._flush_out()
+                sleep = 1
+            await asyncio.sleep_ms(sleep)  # Yield to event loop
 
     def _read_available(self):
-        """Read all available bytes from stdin into the buffer."""
-        while True:
-            try:
-                ch = sys.stdin.read(1)
-                if ch:
-                    if isinstance(ch, str):
-                        self._buf.extend(ch.encode("utf-8"))
-                    else:
-                        self._buf.extend(ch)
-                else:
+        """Read all available bytes from stdin into the buffer.
+
+        Still a byte per read: MicroPython's stdin read(n) blocks until n
+        bytes arrive, and poll() only says that at least one is waiting.
+        Each byte lands in a preallocated buffer as raw bytes, so there's
+        no per-byte str object or UTF-8 re-encode.
+        """
+        one = self._rx_byte
+        buf = self._buf
+        poll = self._poll_poll
+        try:
+            # Stop as soon as nothing more is waiting
+            while _stdin_readinto(one):
+                buf.append(one[0])
+                if not poll(0):
                     break
-            except Exception:
-                break
-            # Check if more data waiting
-            if not self._poll.poll(0):
-                break
+        except Exception:
+            pass
 
     def _process_buffer(self):
         """Extract complete newline-delimited lines and send via BLE."""
-        # Safety: prevent runaway buffer
-        if len(self._buf) > _BUF_OVERFLOW and b"\n" not in self._buf:
-            print("Bridge: buffer overflow, clearing")
-            self._buf = bytearray()
-            return
-
-        while b"\n" in self._buf:
-            idx = self._buf.index(b"\n")
-            line_bytes = bytes(self._buf[:idx])  # Exclude \n for chunking check
-            self._buf = self._buf[idx + 1:]
+        # Walk the lines with a cursor and trim the consumed prefix once
+        # at the end, instead of re-slicing the buffer for every line
+        buf = self._buf
+        mv = memoryview(buf)
+        start = 0
+        # Short lines that sit back to back in the buffer are batched and
+        # sent as one notification (up to _CHUNK_SIZE); the receiver splits
+        # on \n anyway. The batch is the view buf[batch:pend].
+        batch = pend = 0
+        connected = self._ble.connected
+        while True:
+            idx = buf.find(b"\n", start)
+            if idx < 0:
+                break
+            # Lines are handed on as views into the buffer -- no copy
+            line_start = start
+            start = idx + 1
 
             # TOOL: messages are icon notifications from the MCP server
             # when using WiFi transport. Display only, don't forward to BLE.
-            if line_bytes.startswith(b"TOOL:"):
-                if self._on_activity:
-                    try:
-                        cmd = line_bytes[5:].decode("utf-8", "replace").strip()
-                        self._on_activity("tool_notify", cmd)
-                    except Exception:
-                        pass
+            if buf.find(b"TOOL:", line_start, line_start + 5) == line_start:
+                try:
+                    cmd = bytes(mv[line_start + 5:idx]).decode(
+                        "utf-8", "replace").strip()
+                    self._on_activity("tool_notify", cmd)
+                except Exception:
+                    pass
                 continue
 
-            if len(line_bytes) > _CHUNK_PAYLOAD:
-                self._send_chunked(line_bytes)
-            else:
-                # Send with \n included as single message
-                self._send_ble(line_bytes + b"\n")
+            if not connected:
+                # Drop the line before any chunking or preview work; it
+                # is still consumed from the buffer below
+                continue
+
+            # Length excludes \n for the chunking check
+            if idx - line_start > _CHUNK_PAYLOAD:
+                if pend > batch:
+                    self._send_ble(mv[batch:pend])
+                self._send_chunked(mv[line_start:idx])
+                batch = pend = start
+                continue
+
+            if pend != line_start or start - batch > _CHUNK_SIZE:
+                # Not contiguous with the batch, or it wouldn't fit
+                if pend > batch:
+                    self._send_ble(mv[batch:pend])
+                batch = line_start
+            pend = start  # Joins the batch with its \n included
+            self._report_tx(mv[line_start:idx])
+
+        if pend > batch:
+            self._send_ble(mv[batch:pend])
+        del mv  # Release the view before resizing the buffer
+        if start:
+            # In place: the same bytearray keeps carrying the partial tail
+            buf[:start] = b""
+
+        # Safety: prevent runaway buffer. The last find() already showed
+        # what's left holds no \n, so there's no need to scan it again.
+        if len(buf) > _BUF_OVERFLOW:
+            print("Bridge: buffer overflow, clearing")
+            buf[:] = b""
 
     def _send_chunked(self, data_bytes):
-        """Split a large message into CHUNK:n/N: formatted BLE writes.
+        """Split a large message (bytes-like) into CHUNK:n/N: BLE writes.
 
         Each chunk is \n-terminated so the Pi processes them individually.
         Each chunk must fit in a single BLE notification (_CHUNK_SIZE bytes)
@@ -186,60 +301,96 @@ class SerialBridge:
         if not self._ble.connected:
             return
 
-        data_str = data_bytes.decode("utf-8", "replace")
         # Reserve space for header ("CHUNK:nn/nn:" max 12) + \n (1)
         chunk_data_size = _CHUNK_SIZE - 20  # 180 bytes of payload per chunk
-        total = (len(data_str) + chunk_data_size - 1) // chunk_data_size
-
-        if self._on_activity:
-            try:
-                self._on_activity("serial_in", "CHUNK 1/{} {}".format(
-                    total, data_str[:30]))
-            except Exception:
-                pass
+        length = len(data_bytes)
+
+        # Split on bytes -- no decode/re-encode -- but back each cut off to
+        # a UTF-8 character start so every chunk still decodes on its own
+        ends = []
+        start = 0
+        while start < length:
+            end = start + chunk_data_size
+            if end >= length:
+                end = length
+            else:
+                while end > start and (data_bytes[end] & 0xC0) == 0x80:
+                    end -= 1
+                if end == start:
+                    end = start + chunk_data_size  # Not UTF-8; cut anyway
+            ends.append(end)
+            start = end
+        total = len(ends)
 
+        try:
+            self._on_activity("serial_in", "CHUNK 1/{} {}".format(
+                total, bytes(data_bytes[:30]).decode("utf-8", "replace")))
+        except Exception:
+            pass
+
+        # Assemble each packet in place: header, payload copied straight out
+        # of the message via a view, then \n -- no slice or concat objects
+        pkt = self._tx_pkt
+        pkt_mv = self._tx_mv
+        src = memoryview(data_bytes)
+        # The total is fixed per message: bake it into the header format
+        hdr_fmt = b"CHUNK:%%d/%d:" % total
+        start = 0
         for i in range(total):
-            start = i * chunk_data_size
-            end = min(start + chunk_data_size, len(data_str))
+            end = ends[i]
+            hdr = hdr_fmt % (i + 1)
+            h = len(hdr)
+            size = h + end - start
+            pkt[:h] = hdr
+            pkt[h:size] = src[start:end]
             # Every chunk gets \n so Pi can process each independently
-            chunk_msg = "CHUNK:{}/{}:{}\n".format(i + 1, total, data_str[start:end])
-            self._send_ble(chunk_msg.encode("utf-8"))
+            pkt[size] = 10
+            # Sized to fit one notification by construction, so this skips
+            # _send_ble's size check; send_raw drops it if disconnected
+            self._ble_send(pkt_mv[:size + 1])
+            start = end
             # Delay between notifications to avoid BLE stack congestion
             if i < total - 1:
                 time.sleep_ms(20)
 
+    def _report_tx(self, line):
+        """Activity callback for one outbound line (a view, no \n).
+        Runs per line even when lines share a notification; only called
+        while connected."""
+        try:
+            preview = _preview(line)
+            if not preview.startswith("CHUNK:"):
+                self._on_activity("serial_in", preview)
+        except Exception:
+            pass
+
     def _send_ble(self, data_bytes):
-        """Send bytes as a single BLE TX notification.
+        """Send bytes (or a memoryview) as a single BLE TX notification.
 
         Data MUST fit in a single notification (<= _CHUNK_SIZE bytes).
         Messages exceeding this are handled by _send_chunked instead.
-        Rapid consecutive notifications can be dropped by the BLE stack.
+        Rapid consecutive notifications can be dropped by the BLE stack,
+        which is why _process_buffer batches short lines.
         """
         if not self._ble.connected:
             return
 
-        if self._on_activity and not data_bytes.startswith(b"CHUNK:"):
-            try:
-                preview = data_bytes[:40].decode("utf-8", "replace").rstrip("\n")
-                self._on_activity("serial_in", preview)
-            except Exception:
-                pass
-
         if len(data_bytes) > _CHUNK_SIZE:
             print("Bridge: WARNING notification {} > {} bytes".format(
                 len(data_bytes), _CHUNK_SIZE))
-        self._ble.send_raw(data_bytes)
+        self._ble_send(data_bytes)
 
     def _check_chunk_timeout(self):
         """Discard incomplete inbound chunk sequences after timeout."""
-        if self._chunk_ts and self._chunk_buf:
+        if self._chunk_ts and self._chunk_count:
             now = time.ticks_ms()
             if time.ticks_diff(now, self._chunk_ts) > _CHUNK_TIMEOUT_MS:
                 print("Bridge: chunk timeout, discarding {} of {} chunks".format(
-                    len(self._chunk_buf), self._chunk_total))
-                err = "ERR:CHUNK_TIMEOUT:received {}/{} chunks\n".format(
-                    len(self._chunk_buf), self._chunk_total)
-                sys.stdout.write(err)
-                self._chunk_buf = {}
+                    self._chunk_count, self._chunk_total))
+                err = "ERR:CHUNK_TIMEOUT:received {}/{} chunks".format(
+                    self._chunk_count, self._chunk_total)
+                self._emit(err.encode())
+                self._chunk_parts = None
+                self._chunk_count = 0
                 self._chunk_total = 0
                 self._chunk_ts = 0